@@ -25,6 +25,14 @@ print("API Key:", api_key)  # This will help you verify if the key is being read
 
 genai.configure(api_key=api_key)
 
+def read_csv_content(content):
+    """Parse CSV bytes with pandas' pyarrow engine, falling back to the C engine
+    when pyarrow is not installed or rejects the file"""
+    try:
+        return pd.read_csv(io.BytesIO(content), engine='pyarrow')
+    except (ImportError, ValueError):
+        return pd.read_csv(io.BytesIO(content))
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"success": True, "message": "Analysis server is running", "port": 5000})
@@ -101,7 +109,7 @@ def upload_file():
                 uploaded_files[filename] = filename
                 
                 # Create DataFrame from content for preview
-                df = pd.read_csv(io.BytesIO(file_content))
+                df = read_csv_content(file_content)
                 
                 preview = df.head(3).to_dict('records')
                 columns = df.columns.tolist()
@@ -134,7 +142,7 @@ def query_csv():
         file_content = db_fs.get_file(filename, DATASETS_DIR)
         
         # Read the content into a DataFrame
-        df = pd.read_csv(io.BytesIO(file_content))
+        df = read_csv_content(file_content)
         
         # Use the chat_with_csv function with Gemini
         result = chat_with_csv(df, query)
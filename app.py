@@ -1,4 +1,5 @@
 from flask import Flask, request, jsonify, send_file, render_template, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 import pandas as pd
 import os
 import io
@@ -7,15 +8,18 @@ import shutil
 import uuid
 import json
 import logging
-import tempfile
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
-import base64
+import threading
 import csv
 import traceback
 import yaml
 from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from PIL import Image
@@ -30,10 +34,40 @@ from db_system_integration import apply_patches
 from db_file_system import DBFileSystem
 import google.generativeai as genai
 from flask_cors import CORS
+from flask_compress import Compress
 from dotenv import load_dotenv
 import numpy as np
 import re
 
+# orjson parses LLM JSON and serializes large preview payloads much faster than
+# the stdlib; fall back to json/Flask's default provider when it is not installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (NumPy values and non-str keys supported)"""
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # jsonify() goes through here; hand orjson's bytes to the response as-is rather
+        # than decoding to str and letting Werkzeug encode the (base64-heavy) body again
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option), mimetype=self.mimetype
+        )
+
 # Load environment variables
 # Try .env.local first (for Next.js dev setups), then fall back to default .env if present
 load_dotenv('.env.local')
@@ -41,8 +75,15 @@ load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
 
+# Compress JSON responses (CSV previews, base64 plots); level 4 keeps CPU cost low
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html']
+app.config['COMPRESS_LEVEL'] = 4
+Compress(app)
+
 db_fs = apply_patches()
 
 # Configure Gemini API
@@ -103,6 +144,35 @@ os.makedirs(MODELS_DIR, exist_ok=True)
 DOWNLOADS_DIR = os.path.join(BASE_DIR, 'downloads')
 os.makedirs(DOWNLOADS_DIR, exist_ok=True)
 
+# In-memory LRU cache for project ZIPs served from the database. Generated
+# archives are immutable (uuid-named), so repeat downloads can skip the DB fetch.
+DL_CACHE_BYTES = int(os.getenv('DL_CACHE_MB', '512')) * 1024 * 1024
+DL_CACHE_MAX_ITEM_BYTES = 128 * 1024 * 1024
+_dl_cache = OrderedDict()
+_dl_cache_size = 0
+_dl_cache_lock = threading.Lock()
+
+def get_download_content(filename):
+    """Fetch a file from the downloads directory in the database, via the LRU cache"""
+    global _dl_cache_size
+    with _dl_cache_lock:
+        if filename in _dl_cache:
+            _dl_cache.move_to_end(filename)
+            return _dl_cache[filename]
+
+    content = db_fs.get_file(filename, 'downloads')
+    if not content or len(content) > DL_CACHE_MAX_ITEM_BYTES:
+        return content
+
+    with _dl_cache_lock:
+        if filename not in _dl_cache:
+            _dl_cache[filename] = content
+            _dl_cache_size += len(content)
+            while _dl_cache_size > DL_CACHE_BYTES and _dl_cache:
+                _, evicted = _dl_cache.popitem(last=False)
+                _dl_cache_size -= len(evicted)
+    return content
+
 # Create a directory for CSV analysis files
 CSV_ANALYSIS_DIR = os.path.join(BASE_DIR, 'csv_analysis')
 os.makedirs(CSV_ANALYSIS_DIR, exist_ok=True)
@@ -112,6 +182,20 @@ DATASET_DIR = "datasets"
 EXPORTS_DIR = "exports"
 DEPLOYMENT_DIR = "deployments"
 
+# Max concurrent LLM requests when generating rows
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+# Rows requested per LLM call; keeps each JSON array well inside the token budget
+LLM_ROWS_PER_REQUEST = 25
+
+# Shared OpenRouter session: keep-alive connections sized for LLM_MAX_CONCURRENCY workers.
+# The adapter only retries failed connections; 429/5xx are retried by generate_with_retry.
+openrouter_session = requests.Session()
+openrouter_session.mount("https://", HTTPAdapter(
+    pool_connections=LLM_MAX_CONCURRENCY,
+    pool_maxsize=LLM_MAX_CONCURRENCY,
+    max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5),
+))
+
 # Set up logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -137,8 +221,152 @@ try:
 except ImportError:
     YOLO_AVAILABLE = False
 
+# pyarrow's CSV reader is multithreaded; fall back to pandas when it is not installed
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# python-calamine gives pandas a much faster xlsx reader; otherwise pandas picks openpyxl
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# OpenCV's flip/warpAffine/imencode are SIMD-accelerated and release the GIL;
+# image augmentation falls back to Pillow when it is not installed
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+def read_csv_bytes(content):
+    """Parse CSV bytes into a DataFrame, using pyarrow's multithreaded reader when available"""
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(io.BytesIO(content))
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=1 << 20)
+    # Empty cells and the NA markers pandas knows are nulls in string columns too
+    null_values = sorted(set(pacsv.ConvertOptions().null_values) | {"None", "<NA>"})
+    try:
+        table = pacsv.read_csv(io.BytesIO(content), read_options=read_options,
+                               convert_options=pacsv.ConvertOptions(strings_can_be_null=True,
+                                                                    null_values=null_values))
+        if len(set(table.column_names)) != len(table.column_names):
+            # Duplicate headers: pandas renames them to a, a.1, ...
+            return pd.read_csv(io.BytesIO(content))
+        # pyarrow infers dates/times; keep those columns as text like pd.read_csv does
+        temporal = {f.name: pa.string() for f in table.schema if pa.types.is_temporal(f.type)}
+        if temporal:
+            table = pacsv.read_csv(io.BytesIO(content), read_options=read_options,
+                                   convert_options=pacsv.ConvertOptions(column_types=temporal,
+                                                                        strings_can_be_null=True,
+                                                                        null_values=null_values))
+        # All-empty columns come back with pyarrow's null type; pandas reads them as float64 NaN
+        for i, field in enumerate(table.schema):
+            if pa.types.is_null(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        return table.to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Ragged rows, mixed-type blocks, etc. - let pandas handle them
+        return pd.read_csv(io.BytesIO(content))
+
 # ===== DATASET PROCESSING CLASSES AND FUNCTIONS =====
 
+# genai.list_models() is a network round-trip; share its result across requests for a while
+GEMINI_MODELS_TTL_SECONDS = 600
+_gemini_models = frozenset()
+_gemini_models_fetched_at = 0.0
+_gemini_models_lock = threading.Lock()
+
+def gemini_available_models():
+    """Model names reported by genai.list_models(), refreshed at most every GEMINI_MODELS_TTL_SECONDS"""
+    global _gemini_models, _gemini_models_fetched_at
+    with _gemini_models_lock:
+        if _gemini_models and time.monotonic() - _gemini_models_fetched_at < GEMINI_MODELS_TTL_SECONDS:
+            return _gemini_models
+    try:
+        names = frozenset(filter(None, (getattr(m, "name", "") for m in genai.list_models())))
+    except Exception:
+        # Listing failed: callers fall back to the requested list, and the next call tries again
+        return frozenset()
+    with _gemini_models_lock:
+        _gemini_models, _gemini_models_fetched_at = names, time.monotonic()
+    return names
+
+# Encoder settings for augmented copies: JPEG at a fixed quality, PNG with light zlib
+# effort - the zip stores both as-is, so slow maximum compression buys little
+AUGMENT_SAVE_OPTIONS = {"JPEG": {"quality": 85}, "PNG": {"compress_level": 1}}
+
+def _augment_with_pil(content, ext, num_copies):
+    img = Image.open(io.BytesIO(content))
+    fmt = Image.registered_extensions().get(ext.lower(), img.format)
+    save_options = AUGMENT_SAVE_OPTIONS.get(fmt, {})
+    encoded = []
+    for i in range(num_copies):
+        if i % 3 == 0:
+            aug = img.transpose(Image.FLIP_LEFT_RIGHT)
+        elif i % 3 == 1:
+            aug = img.rotate(15 * (i+1))
+        else:
+            aug = img.rotate(-15 * (i+1))
+        buf = io.BytesIO()
+        aug.save(buf, format=fmt, **save_options)
+        encoded.append(buf.getvalue())
+    return encoded
+
+def _augment_with_cv2(content, ext, num_copies):
+    img = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        # Formats/variants OpenCV cannot decode
+        return _augment_with_pil(content, ext, num_copies)
+    h, w = img.shape[:2]
+    ext = ext.lower()
+    if ext in ('.jpg', '.jpeg'):
+        params = [cv2.IMWRITE_JPEG_QUALITY, AUGMENT_SAVE_OPTIONS["JPEG"]["quality"]]
+    else:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, AUGMENT_SAVE_OPTIONS["PNG"]["compress_level"]]
+    encoded = []
+    for i in range(num_copies):
+        if i % 3 == 0:
+            aug = cv2.flip(img, 1)
+        else:
+            # Same as Image.rotate: counter-clockwise about the center, same size,
+            # nearest-neighbour sampling and black corners
+            angle = 15 * (i+1) if i % 3 == 1 else -15 * (i+1)
+            matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+            aug = cv2.warpAffine(img, matrix, (w, h), flags=cv2.INTER_NEAREST)
+        ok, buf = cv2.imencode(ext, aug, params)
+        if not ok:
+            raise ValueError(f"Could not encode augmented image as {ext}")
+        encoded.append(buf.tobytes())
+    return encoded
+
+def augment_image(content, filename, num_copies):
+    """Return [(arcname, bytes)] for an uploaded image and num_copies flipped/rotated variants"""
+    img_basename, ext = os.path.splitext(filename)
+    augment = _augment_with_cv2 if CV2_AVAILABLE else _augment_with_pil
+
+    # Keep the original bytes instead of re-encoding them
+    entries = [(f"{img_basename}{ext}", content)]
+    entries.extend((f"{img_basename}_aug{i+1}{ext}", data)
+                   for i, data in enumerate(augment(content, ext, num_copies)))
+    return entries
+
+# Rule-based alteration patterns, compiled once and searched in precedence order
+# (mul > div > add > sub) so a prompt naming several operations applies the first
+_OP_PATTERNS = (
+    ("mul", re.compile(r"multiply[\w\s]*?(?:by|with)\s*(-?\d+(?:\.\d+)?)")),
+    ("div", re.compile(r"divide[\w\s]*?by\s*(-?\d+(?:\.\d+)?)")),
+    ("add", re.compile(r"(?:add|increase)[\w\s]*?(?:by\s*)?(-?\d+(?:\.\d+)?)")),
+    ("sub", re.compile(r"(?:subtract|decrease|reduce)[\w\s]*?(?:by\s*)?(-?\d+(?:\.\d+)?)")),
+)
+# A percentage anywhere in the prompt ("by 10%", "by 10 %") makes add/sub relative
+_PCT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+
 class DataExpander:
     def __init__(self, openrouter_api_key=None, model_name="meta-llama/llama-3.1-8b-instruct", provider="auto"):
         self.openrouter_api_key = openrouter_api_key or os.getenv("OPENROUTER_API_KEY", "")
@@ -159,7 +387,7 @@ class DataExpander:
         if self.provider == "gemini" and not str(self.model_name).startswith("gemini"):
             self.model_name = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-8b-latest")
 
-    def generate_with_openrouter(self, prompt, system_prompt=None):
+    def generate_with_openrouter(self, prompt, system_prompt=None, max_tokens=1024):
         """Generate response using OpenRouter API"""
         if not self.openrouter_api_key:
             return "NO_API_KEY"
@@ -175,19 +403,36 @@ class DataExpander:
         payload = {
             "model": self.model_name,
             "messages": messages,
-            "max_tokens": 1024,
-            "temperature": 0.2
+            "max_tokens": max_tokens,
+            "temperature": 0.2,
+            "stream": True
         }
         try:
-            response = requests.post(url, headers=headers, json=payload)
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                return f"Error: {response.status_code} - {response.text}"
+            with openrouter_session.post(url, headers=headers, json=payload, timeout=60, stream=True) as response:
+                if response.status_code != 200:
+                    return f"Error: {response.status_code} - {response.text}"
+                # Server-sent events: collect content deltas as they arrive
+                parts = []
+                for line in response.iter_lines():
+                    # skips blank keep-alives and ": OPENROUTER PROCESSING" comments
+                    if not line.startswith(b"data: "):
+                        continue
+                    data = line[6:]
+                    if data == b"[DONE]":
+                        break
+                    chunk = json_loads(data)
+                    if "error" in chunk:
+                        # Mid-stream failure; keep the "Error: <code>" shape generate_with_retry checks
+                        error = chunk["error"]
+                        return f"Error: {error.get('code', 500)} - {error.get('message', '')}"
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        parts.append(choices[0].get("delta", {}).get("content") or "")
+                return "".join(parts)
         except Exception as e:
             return f"Connection error: {str(e)}"
 
-    def generate_with_gemini(self, prompt, system_prompt=None):
+    def generate_with_gemini(self, prompt, system_prompt=None, max_tokens=1024):
         """Generate response using Google Gemini API with robust model discovery/fallback"""
         if not os.getenv("GOOGLE_API_KEY"):
             return "NO_GEMINI_API_KEY"
@@ -202,16 +447,8 @@ class DataExpander:
             "gemini-2.5-flash",
             "gemini-1.5-pro",
         ]
-        # Query available models to filter invalid ones
-        available = set()
-        try:
-            for m in genai.list_models():
-                name = getattr(m, "name", "")
-                if name:
-                    available.add(name)
-        except Exception:
-            # If listing fails, fall back to requested list
-            pass
+        # Query available models to filter invalid ones (empty if listing fails)
+        available = gemini_available_models()
         candidates = []
         for m in requested:
             # list_models returns names prefixed with "models/"
@@ -232,7 +469,7 @@ class DataExpander:
                     content,
                     generation_config={
                         "temperature": 0.2,
-                        "max_output_tokens": 1024,
+                        "max_output_tokens": max_tokens,
                     },
                 )
                 text = getattr(resp, "text", None)
@@ -247,14 +484,44 @@ class DataExpander:
                 continue
         return f"Connection error: {last_err or 'Unknown error'}"
 
-    def generate(self, prompt, system_prompt=None):
+    def generate(self, prompt, system_prompt=None, max_tokens=1024):
         if self.provider == "openrouter":
-            return self.generate_with_openrouter(prompt, system_prompt)
+            return self.generate_with_openrouter(prompt, system_prompt, max_tokens)
         if self.provider == "gemini":
-            return self.generate_with_gemini(prompt, system_prompt)
+            return self.generate_with_gemini(prompt, system_prompt, max_tokens)
         # offline caller should not call generate(); return marker
         return "NO_PROVIDER"
 
+    @staticmethod
+    def _col_kinds(df):
+        """Classify columns in one pass over df.dtypes.
+        Returns (numeric columns, other columns, {numeric column: is integer}); numeric
+        matches select_dtypes(include="number"), so bool columns count as other.
+        """
+        numeric, other, is_int = [], [], {}
+        for col, dtype in df.dtypes.items():
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                numeric.append(col)
+                is_int[col] = pd.api.types.is_integer_dtype(dtype)
+            else:
+                other.append(col)
+        return numeric, other, is_int
+
+    @staticmethod
+    def _value_pool(series):
+        """Factorize the non-blank values of a column into (per-row codes, unique values).
+        Sampling codes keeps the original value frequencies without shuffling Python objects.
+        """
+        values = series.dropna()
+        values = values[values.astype(str).str.strip() != ""]
+        codes, uniques = pd.factorize(values)
+        return codes, np.asarray(uniques, dtype=object)
+
+    @staticmethod
+    def _sample_pool(rng, pool, size):
+        codes, uniques = pool
+        return uniques.take(codes[rng.integers(0, len(codes), size=size)])
+
     def expand_csv_offline(self, df, num_samples):
         """Generate synthetic rows without external APIs.
         - Numeric columns: sample around mean with small noise.
@@ -264,37 +531,38 @@ class DataExpander:
             return df
         rng = np.random.default_rng()
         cols = list(df.columns)
-        out_rows = df.to_dict(orient="records")
 
         # Precompute stats and value pools
-        numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
-        stats = {col: (df[col].mean(), df[col].std(ddof=0) if df[col].std(ddof=0) > 0 else (abs(df[col].mean()) or 1.0)) for col in numeric_cols}
-        pools = {}
-        for col in cols:
-            if col not in numeric_cols:
-                values = [v for v in df[col].dropna().tolist() if str(v).strip() != ""]
-                pools[col] = values if values else []
-
-        for i in range(num_samples):
-            new_row = {}
-            for col in cols:
-                if col in numeric_cols:
-                    mu, sigma = stats[col]
-                    # Use 10% of std as noise if sigma is too small
-                    s = sigma if sigma and sigma > 0 else (abs(mu) * 0.1 or 1.0)
-                    val = float(rng.normal(mu, s))
-                    # If original column looked like int, round
-                    if pd.api.types.is_integer_dtype(df[col].dtype):
-                        val = int(round(val))
-                    new_row[col] = val
+        numeric_cols, other_cols, is_int = self._col_kinds(df)
+        pools = {col: self._value_pool(df[col]) for col in other_cols}
+
+        # Draw all numeric cells in one call, one column per numeric feature
+        synth = {}
+        if numeric_cols:
+            # Column-wise mean/std in one pass each instead of per-column calls
+            mu = df[numeric_cols].mean().to_numpy(dtype=float)
+            std = df[numeric_cols].std(ddof=0).to_numpy(dtype=float)
+            # Flat or empty columns: scale the noise by |mean|, or 1.0 if that is zero too
+            abs_mu = np.abs(mu)
+            sigma = np.where(std > 0, std, np.where(abs_mu > 0, abs_mu, 1.0))
+            # One contiguous row per column, filled in place: z * sigma + mu, then rint for int columns
+            draws = np.empty((len(numeric_cols), num_samples))
+            rng.standard_normal(out=draws)
+            draws *= sigma[:, None]
+            draws += mu[:, None]
+            for j, col in enumerate(numeric_cols):
+                if is_int[col]:
+                    synth[col] = np.rint(draws[j], out=draws[j]).astype(np.int64)
                 else:
-                    pool = pools.get(col, [])
-                    if pool:
-                        new_row[col] = rng.choice(pool)
-                    else:
-                        new_row[col] = f"synthetic_{i+1}"
-            out_rows.append(new_row)
-        return pd.DataFrame(out_rows)
+                    synth[col] = draws[j]
+
+        for col in other_cols:
+            pool = pools[col]
+            if len(pool[0]):
+                synth[col] = self._sample_pool(rng, pool, num_samples)
+            else:
+                synth[col] = [f"synthetic_{i+1}" for i in range(num_samples)]
+        return pd.concat([df, pd.DataFrame(synth, columns=cols)], ignore_index=True)
 
     def alter_csv_offline(self, df, alter_prompt):
         """Lightweight offline alteration without LLM when no specific rule matches.
@@ -304,39 +572,53 @@ class DataExpander:
         if df.empty:
             return df
         rng = np.random.default_rng()
-        out = df.copy(deep=True)
-        n = len(out)
-        if n == 0:
-            return out
+        n = len(df)
         frac = 0.2 if n < 100 else 0.1
-        idx = out.sample(frac=frac, random_state=42).index if n > 1 else out.index
+        # Same rows DataFrame.sample(frac, random_state=42) would pick, as positions
+        pos = pd.Series(np.arange(n)).sample(frac=frac, random_state=42).to_numpy() if n > 1 else np.arange(n)
+
+        # df is left untouched: only the columns that change are rebuilt
+        changed = {}
 
         # Numeric columns
-        num_cols = out.select_dtypes(include=["number"]).columns.tolist()
+        num_cols, other_cols, is_int = self._col_kinds(df)
+        means = df[num_cols].mean()
+        stds = df[num_cols].std(ddof=0)
         for col in num_cols:
-            series = out.loc[idx, col].astype(float)
-            mu = float(df[col].mean()) if pd.notna(df[col].mean()) else 0.0
-            sd = float(df[col].std(ddof=0)) if pd.notna(df[col].std(ddof=0)) and df[col].std(ddof=0) > 0 else (abs(mu) * 0.1 or 1.0)
-            noise = rng.normal(0.0, sd * 0.1, size=len(series))
-            out.loc[idx, col] = series + noise
-            if pd.api.types.is_integer_dtype(df[col].dtype):
-                out[col] = out[col].round().astype(int)
+            mean = means[col]
+            std = stds[col]
+            mu = float(mean) if pd.notna(mean) else 0.0
+            sd = float(std) if pd.notna(std) and std > 0 else (abs(mu) * 0.1 or 1.0)
+            values = df[col].to_numpy(dtype=float, na_value=np.nan, copy=True)
+            values[pos] += rng.normal(0.0, sd * 0.1, size=len(pos))
             # keep non-negative if original data is non-negative
             if (df[col] >= 0).all():
-                out[col] = out[col].clip(lower=0)
-
-        # Non-numeric columns
-        other_cols = [c for c in out.columns if c not in num_cols]
-        for col in other_cols:
-            values = [v for v in df[col].dropna().tolist() if str(v).strip() != ""]
-            if not values:
+                np.clip(values, 0, None, out=values)
+            if is_int[col]:
+                values = np.rint(values).astype(int)
+            changed[col] = values
+
+        # Non-numeric columns: a random mask splits the sampled rows between
+        # swapping in another value from the column and appending a '*' suffix
+        # swap/suffix decisions for every (sampled row, column) from a single RNG call
+        swap_matrix = rng.random((len(pos), len(other_cols))) < 0.5
+        for j, col in enumerate(other_cols):
+            pool = self._value_pool(df[col])
+            if not len(pool[0]):
                 continue
-            for i in idx:
-                if rng.random() < 0.5:
-                    out.at[i, col] = str(rng.choice(values))
-                else:
-                    base = str(out.at[i, col]) if pd.notna(out.at[i, col]) else ""
-                    out.at[i, col] = (base + "*").strip()
+            swap = swap_matrix[:, j]
+            swap_pos, suffix_pos = pos[swap], pos[~swap]
+            values = df[col].to_numpy(dtype=object, copy=True)
+            values[swap_pos] = self._sample_pool(rng, pool, len(swap_pos)).astype(str)
+            base = df[col].iloc[suffix_pos]
+            values[suffix_pos] = base.astype(str).where(base.notna(), "").add("*").str.strip().to_numpy()
+            changed[col] = values
+
+        # A shallow copy shares the untouched columns with df; assigning replaces
+        # the changed ones without writing into df's buffers
+        out = df.copy(deep=False)
+        for col, values in changed.items():
+            out[col] = values
         return out
 
     def alter_csv_rule_based(self, df, alter_prompt):
@@ -358,14 +640,16 @@ class DataExpander:
         low = text.lower()
 
         # Determine target columns
-        all_numeric = df.select_dtypes(include=["number"]).columns.tolist()
+        all_numeric = self._col_kinds(df)[0]
         targets = set(all_numeric)  # default to all numeric
 
-        # Try to detect explicit columns mentioned in the prompt
+        # Try to detect explicit columns mentioned in the prompt; every column named counts,
+        # so "unit price" targets both "unit price" and "price" when both exist
         mentioned = []
         for col in df.columns:
-            pattern = r"\b" + re.escape(str(col).lower()) + r"\b"
-            if re.search(pattern, low):
+            name = str(col).lower()
+            # Cheap substring test first; most columns are not mentioned at all
+            if name in low and re.search(r"\b" + re.escape(name) + r"\b", low):
                 mentioned.append(col)
         if mentioned:
             targets = set([c for c in mentioned if c in df.columns])
@@ -378,78 +662,47 @@ class DataExpander:
             except Exception:
                 return None
 
-        # Detect operations
-        num = None
+        # Detect operation: the first pattern in precedence order that matches wins
         op = None
+        for name, pattern in _OP_PATTERNS:
+            m = pattern.search(low)
+            if m:
+                op = name
+                break
+        num = parse_number(m.group(1)) if op else None
         pct = False
+        if op in ("add", "sub"):
+            m_pct = _PCT_RE.search(low)
+            if m_pct:
+                num = float(m_pct.group(1))
+                pct = True
 
-        # percent patterns like 10%
-        m_pct = re.search(r"(\d+(?:\.\d+)?)\s*%", low)
-        if m_pct:
-            num = float(m_pct.group(1))
-            pct = True
-
-        # multiply
-        if op is None:
-            m = re.search(r"multiply[\w\s]*?(?:by|with)\s*(-?\d+(?:\.\d+)?)", low)
-            if m:
-                op = "mul"
-                num = parse_number(m.group(1))
-        # divide
         if op is None:
-            m = re.search(r"divide[\w\s]*?by\s*(-?\d+(?:\.\d+)?)", low)
-            if m:
-                op = "div"
-                num = parse_number(m.group(1))
-        # add/increase
-        if op is None and ("add" in low or "increase" in low):
-            m = re.search(r"(?:add|increase)[\w\s]*?(?:by\s*)?(-?\d+(?:\.\d+)?)(?:\s*%)?", low)
-            if m:
-                op = "add"
-                if pct and num is not None:
-                    pass
-                else:
-                    num = parse_number(m.group(1))
-        # subtract/decrease/reduce
-        if op is None and ("subtract" in low or "decrease" in low or "reduce" in low):
-            m = re.search(r"(?:subtract|decrease|reduce)[\w\s]*?(?:by\s*)?(-?\d+(?:\.\d+)?)(?:\s*%)?", low)
-            if m:
-                op = "sub"
-                if pct and num is not None:
-                    pass
-                else:
-                    num = parse_number(m.group(1))
+            return df, False
 
-        if op is None:
+        cols = [c for c in df.columns if c in targets and pd.api.types.is_numeric_dtype(df[c])]
+        if not cols or num is None or (op == "div" and num == 0):
             return df, False
 
-        out = df.copy()
-        applied = False
-        for col in targets:
-            if col not in out.columns:
-                continue
-            if not pd.api.types.is_numeric_dtype(out[col]):
-                continue
-            series = out[col].astype(float)
-            if op == "mul" and num is not None:
-                out[col] = series * num
-                applied = True
-            elif op == "div" and num not in (None, 0):
-                out[col] = series / num
-                applied = True
-            elif op == "add" and num is not None:
-                if pct:
-                    out[col] = series * (1.0 + num / 100.0)
-                else:
-                    out[col] = series + num
-                applied = True
-            elif op == "sub" and num is not None:
-                if pct:
-                    out[col] = series * (1.0 - num / 100.0)
-                else:
-                    out[col] = series - num
-                applied = True
-        return out, applied
+        # Every target column gets the same scalar op, so apply it once to a float64 block
+        # of all of them in place rather than column by column (copy: a single float64
+        # column can come back as a read-only view of df)
+        block = df[cols].to_numpy(dtype=np.float64, copy=True)
+        if op == "mul":
+            np.multiply(block, num, out=block)
+        elif op == "div":
+            np.divide(block, num, out=block)
+        elif pct:
+            np.multiply(block, 1.0 + (num if op == "add" else -num) / 100.0, out=block)
+        elif op == "add":
+            np.add(block, num, out=block)
+        else:
+            np.subtract(block, num, out=block)
+
+        out = df.copy(deep=False)
+        for i, col in enumerate(cols):
+            out[col] = block[:, i]
+        return out, True
 
     def alter_csv(self, df, alter_prompt):
         """Alter CSV data using a prompt via Llama on OpenRouter"""
@@ -488,7 +741,6 @@ Return the modified CSV only, no extra text or explanations.
         
         # Try to parse the returned CSV
         try:
-            from io import StringIO
             # Clean the response
             response_text = response_text.strip()
             if response_text.startswith('```csv'):
@@ -499,7 +751,7 @@ Return the modified CSV only, no extra text or explanations.
                 response_text = response_text[:-3]
             response_text = response_text.strip()
             
-            df_out = pd.read_csv(StringIO(response_text))
+            df_out = read_csv_bytes(response_text.encode('utf-8'))
             return df_out
         except Exception as e:
             print(f"Could not parse the altered CSV: {str(e)}")
@@ -507,6 +759,15 @@ Return the modified CSV only, no extra text or explanations.
             print(response_text[:500] + "..." if len(response_text) > 500 else response_text)
             return df
 
+    def generate_with_retry(self, prompt, system_prompt=None, max_tokens=1024, retries=3):
+        """generate() with exponential backoff on rate limits (429) and 5xx errors"""
+        for attempt in range(retries + 1):
+            text = self.generate(prompt, system_prompt, max_tokens)
+            retryable = text.startswith("Error: 429") or text.startswith("Error: 5")
+            if not retryable or attempt == retries:
+                return text
+            time.sleep(0.5 * 2 ** attempt)
+
     def expand_csv(self, df, expansion_prompt, num_samples):
         """Expand CSV data by generating new rows"""
         if df.empty:
@@ -514,77 +775,88 @@ Return the modified CSV only, no extra text or explanations.
             return df
         
         fieldnames = list(df.columns)
-        expanded_rows = df.to_dict(orient="records")
 
         print(f"Generating {num_samples} new rows...")
 
-        for i in range(num_samples):
-            # Update progress
-            progress = (i + 1) / num_samples
-            print(f"Generating row {i + 1} of {num_samples}... ({progress*100:.1f}%)")
-            
+        def parse_rows(response_text):
+            # Clean the response to extract JSON
+            response_text = response_text.strip()
+            if response_text.startswith('```json'):
+                response_text = response_text[7:]
+            elif response_text.startswith('```'):
+                response_text = response_text[3:]
+            if response_text.endswith('```'):
+                response_text = response_text[:-3]
+            response_text = response_text.strip()
+            try:
+                data = json_loads(response_text)
+            except json.JSONDecodeError:
+                return []
+            if isinstance(data, dict):
+                data = [data]
+            if not isinstance(data, list):
+                return []
+            return [row for row in data if isinstance(row, dict)]
+
+        def generate_batch(size):
             prompt = (
-                f"Generate a new CSV row as a JSON object for fields: {fieldnames} "
+                f"Generate {size} new CSV rows as a JSON array of objects with fields: {fieldnames} "
                 f"based on: {expansion_prompt}. "
-                f"Return only valid JSON, no additional text or formatting."
+                f"Return only the JSON array, no additional text or formatting."
             )
-            
-            response_text = self.generate(prompt)
-            
-            try:
-                # Clean the response to extract JSON
-                response_text = response_text.strip()
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                elif response_text.startswith('```'):
-                    response_text = response_text[3:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
-                
-                new_row = json.loads(response_text)
-            except json.JSONDecodeError:
-                # Fallback to dummy data if JSON parsing fails
-                new_row = {col: f"generated_{i}" for col in fieldnames}
-                
-            expanded_rows.append({col: new_row.get(col, "") for col in fieldnames})
+            response_text = self.generate_with_retry(prompt, max_tokens=max(1024, 96 * size))
+            return parse_rows(response_text)[:size]
+
+        # Ask for up to LLM_ROWS_PER_REQUEST rows per call and run the calls
+        # concurrently; a second pass re-requests only a short tail.
+        # Generated values go straight into preallocated per-column lists as
+        # batches arrive; rows the model did not return get dummy data
+        synth = {col: [None] * num_samples for col in fieldnames}
+        filled = 0
+        for _ in range(2):
+            missing = num_samples - filled
+            if missing <= 0:
+                break
+            sizes = [min(LLM_ROWS_PER_REQUEST, missing - start) for start in range(0, missing, LLM_ROWS_PER_REQUEST)]
+            with ThreadPoolExecutor(max_workers=max(1, min(LLM_MAX_CONCURRENCY, len(sizes)))) as pool:
+                for rows in pool.map(generate_batch, sizes):
+                    for row in rows[:num_samples - filled]:
+                        for col in fieldnames:
+                            synth[col][filled] = row.get(col, "")
+                        filled += 1
+            print(f"Generated {filled} of {num_samples} rows")
+
+        for i in range(filled, num_samples):
+            for col in fieldnames:
+                synth[col][i] = f"generated_{i}"
         
         print("Generation completed!")
-        out_df = pd.DataFrame(expanded_rows)
-        return out_df
-
-    def expand_images(self, image_files, num_copies):
-        """Expand images by creating augmented versions"""
-        temp_dir = tempfile.mkdtemp()
-        
-        for image_file in image_files:
-            # Read image from uploaded file
-            img = Image.open(image_file)
-            img_basename = os.path.splitext(image_file.filename)[0]
-            ext = os.path.splitext(image_file.filename)[1]
-            
-            # Save original
-            img.save(os.path.join(temp_dir, f"{img_basename}{ext}"))
-            
-            # Generate augmented copies
-            for i in range(num_copies):
-                aug = img.copy()
-                if i % 3 == 0:
-                    aug = aug.transpose(Image.FLIP_LEFT_RIGHT)
-                elif i % 3 == 1:
-                    aug = aug.rotate(15 * (i+1))
-                else:
-                    aug = aug.rotate(-15 * (i+1))
-                aug.save(os.path.join(temp_dir, f"{img_basename}_aug{i+1}{ext}"))
-        
-        # Zip folder
-        zip_path = os.path.join(temp_dir, "expanded_images.zip")
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for file_name in os.listdir(temp_dir):
-                if file_name.endswith(('.jpg','.jpeg','.png')):
-                    zipf.write(os.path.join(temp_dir, file_name), arcname=file_name)
-        
-        return zip_path
+        return pd.concat([df, pd.DataFrame(synth, columns=fieldnames)], ignore_index=True)
+
+    def expand_images(self, image_files, num_copies, sink=None):
+        """Expand images by creating augmented versions, zipped into sink (a new BytesIO if omitted)"""
+        if sink is None:
+            sink = io.BytesIO()
+        
+        # Only JPEG/PNG uploads end up in the archive, so skip anything else up front
+        uploads = [(image_file.read(), image_file.filename) for image_file in image_files
+                   if image_file.filename.endswith(('.jpg','.jpeg','.png'))]
+        
+        # Augment images in parallel (OpenCV/Pillow release the GIL while decoding,
+        # transforming and encoding) and stream each result into the zip as it arrives
+        written = set()
+        workers = max(1, min(len(uploads), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool, \
+                zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as zipf:
+            futures = [pool.submit(augment_image, content, filename, num_copies)
+                       for content, filename in uploads]
+            for future in futures:
+                for arcname, data in future.result():
+                    if arcname not in written:
+                        written.add(arcname)
+                        zipf.writestr(arcname, data)
+        
+        return sink
 
 def generate_data_insights(df):
     """Generate insights about the dataset"""
@@ -638,6 +910,54 @@ def load_config():
     
     return config
 
+def to_csv_bytes(df):
+    """Serialize a DataFrame to UTF-8 CSV bytes in memory"""
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8')
+    return buf.getvalue()
+
+def preview_columnar(df, n=10):
+    """First n rows as {"columns": [...], "rows": [[...], ...]} with missing values as None"""
+    head_df = df.head(n)
+    return {
+        "columns": head_df.columns.tolist(),
+        "rows": head_df.astype(object).where(head_df.notna(), None).values.tolist(),
+    }
+
+# Parsed datasets keyed by (file name, content digest), so preview/expand/alter on the
+# same file share one parse; a re-uploaded file gets a new digest and is parsed again.
+# The digest is the content_hash stored with the file, so a cache hit never reads the blob
+DF_CACHE_SIZE = 8
+_df_cache = OrderedDict()
+_df_cache_lock = threading.Lock()
+
+def load_dataset_df(file_name):
+    """Load a dataset CSV from the database as a DataFrame, reusing a cached parse of the same bytes.
+    The frame is shared between requests, so callers must not modify it in place.
+    Raises FileNotFoundError if the dataset does not exist.
+    """
+    file_content = None
+    content_hash = db_fs.get_file_hash(file_name, DATASET_DIR)
+    if content_hash is None:
+        # Saved before hashes were stored; hash the bytes here
+        file_content = db_fs.get_file(file_name, DATASET_DIR)
+        content_hash = db_fs.content_hash(file_content)
+    key = (file_name, content_hash)
+    with _df_cache_lock:
+        df = _df_cache.get(key)
+        if df is not None:
+            _df_cache.move_to_end(key)
+            return df
+
+    if file_content is None:
+        file_content = db_fs.get_file(file_name, DATASET_DIR)
+    df = read_csv_bytes(file_content)
+    with _df_cache_lock:
+        _df_cache[key] = df
+        while len(_df_cache) > DF_CACHE_SIZE:
+            _df_cache.popitem(last=False)
+    return df
+
 # ===== DATASET PROCESSING API ROUTES =====
 
 @app.route('/api/upload-dataset', methods=['POST'])
@@ -655,59 +975,37 @@ def upload_dataset():
         return jsonify({"error": "Only CSV, XLSX and JSON files are allowed"}), 400
     
     try:
-        # Create a temporary file to save the uploaded content
-        temp_file_path = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1])
-        file.save(temp_file_path.name)
-        temp_file_path.close()
-        
-        # Save the file to the database with original filename
-        with open(temp_file_path.name, 'rb') as temp_file:
-            file_content = temp_file.read()
-            db_fs.save_file_content(file_content, file.filename, DATASET_DIR)
-        
-        # Clean up temporary file
-        os.unlink(temp_file_path.name)
+        # FileStorage is file-like; keep the upload in memory instead of a temp file round-trip
+        file_content = file.read()
         
         # If it's an Excel file, also convert to CSV for easier processing
+        csv_filename = csv_content = excel_error = None
         if file.filename.endswith('.xlsx'):
             try:
-                # Create a temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_excel:
-                    file.seek(0)
-                    file.save(temp_excel.name)
-                    temp_excel_path = temp_excel.name
-                
-                # Read the Excel file
-                excel_df = pd.read_excel(temp_excel_path)
-                
-                # Create CSV filename
+                excel_df = pd.read_excel(io.BytesIO(file_content), engine=EXCEL_ENGINE)
                 csv_filename = file.filename.replace('.xlsx', '.csv')
-                
-                # Save as CSV to a temporary file
-                with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv', encoding='utf-8') as temp_csv:
-                    excel_df.to_csv(temp_csv, index=False)
-                    temp_csv_path = temp_csv.name
-                
-                # Save CSV to database with proper filename
-                with open(temp_csv_path, 'rb') as temp_csv_file:
-                    csv_content = temp_csv_file.read()
-                    db_fs.save_file_content(csv_content, csv_filename, DATASET_DIR)
-                
-                # Clean up temporary files
-                os.unlink(temp_excel_path)
-                os.unlink(temp_csv_path)
-                
-                return jsonify({
-                    "message": f"File {file.filename} uploaded successfully and converted to CSV ({csv_filename})",
-                    "csv_file": csv_filename,
-                    "success": True
-                })
-            except Exception as excel_error:
-                return jsonify({
-                    "message": f"File {file.filename} uploaded but could not convert to CSV: {str(excel_error)}",
-                    "warning": True,
-                    "success": True
-                })
+                csv_content = excel_df.to_csv(index=False).encode('utf-8')
+            except Exception as convert_error:
+                excel_error = convert_error
+        
+        # Save the upload and its CSV (with proper filename) in one transaction
+        with db_fs.transaction():
+            db_fs.save_file_content(file_content, file.filename, DATASET_DIR)
+            if csv_content is not None:
+                db_fs.save_file_content(csv_content, csv_filename, DATASET_DIR)
+        
+        if csv_content is not None:
+            return jsonify({
+                "message": f"File {file.filename} uploaded successfully and converted to CSV ({csv_filename})",
+                "csv_file": csv_filename,
+                "success": True
+            })
+        if excel_error is not None:
+            return jsonify({
+                "message": f"File {file.filename} uploaded but could not convert to CSV: {str(excel_error)}",
+                "warning": True,
+                "success": True
+            })
         
         return jsonify({
             "message": f"File {file.filename} uploaded successfully", 
@@ -722,21 +1020,16 @@ def list_datasets():
     try:
         datasets = []
         
-        # Get CSV datasets from database
-        db_files = db_fs.list_files(DATASET_DIR)
+        # Get CSV datasets and their sizes from database (metadata only, no file content)
+        db_files = db_fs.list_files_with_sizes(DATASET_DIR)
         
-        for filename in db_files:
+        for filename, file_size in db_files:
             if filename.endswith('.csv'):
-                # Get actual file size from database
-                try:
-                    file_content = db_fs.get_file(filename, DATASET_DIR)
-                    file_size_kb = len(file_content) / 1024
-                    if file_size_kb < 1024:
-                        size_str = f"{file_size_kb:.1f} KB"
-                    else:
-                        size_str = f"{file_size_kb/1024:.1f} MB"
-                except:
-                    size_str = "Unknown"
+                file_size_kb = file_size / 1024
+                if file_size_kb < 1024:
+                    size_str = f"{file_size_kb:.1f} KB"
+                else:
+                    size_str = f"{file_size_kb/1024:.1f} MB"
                 
                 datasets.append({
                     "name": filename,
@@ -763,18 +1056,14 @@ def preview_dataset():
         return jsonify({"error": "No file name provided"}), 400
     
     try:
-        # Check if file exists in database
-        if not db_fs.file_exists(file_name, DATASET_DIR):
+        # Load the DataFrame (cached per file content; one hash lookup when already parsed)
+        try:
+            df = load_dataset_df(file_name)
+        except FileNotFoundError:
             return jsonify({"error": f"File {file_name} not found in database"}), 404
         
-        # Get file content from database
-        file_content = db_fs.get_file(file_name, DATASET_DIR)
-        
-        # Read the CSV content into a DataFrame
-        df = pd.read_csv(io.BytesIO(file_content))
-        
         # Get data types for each column
-        column_types = {col: str(df[col].dtype) for col in df.columns}
+        column_types = df.dtypes.astype(str).to_dict()
         
         # Get basic statistics for numeric columns
         numeric_stats = {}
@@ -790,7 +1079,10 @@ def preview_dataset():
         insights = generate_data_insights(df)
         
         # Return enhanced preview data
-        preview_rows = df.to_dict(orient='records') if view_all else df.head(10).to_dict(orient='records')
+        # itertuples yields whole rows without to_dict's per-cell boxing; orjson takes any numpy scalars as-is
+        rows_df = df if view_all else df.head(10)
+        columns = rows_df.columns.tolist()
+        preview_rows = [dict(zip(columns, row)) for row in rows_df.itertuples(index=False, name=None)]
         
         return jsonify({
             "preview": preview_rows,
@@ -823,16 +1115,12 @@ def expand_dataset():
     use_llm = bool(api_key)
     
     try:
-        # Check if file exists in database
-        if not db_fs.file_exists(file_name, DATASET_DIR):
+        # Load the DataFrame (cached per file content; one hash lookup when already parsed)
+        try:
+            df = load_dataset_df(file_name)
+        except FileNotFoundError:
             return jsonify({"error": f"File {file_name} not found in database"}), 404
         
-        # Get file content from database
-        file_content = db_fs.get_file(file_name, DATASET_DIR)
-        
-        # Read the CSV content into a DataFrame
-        df = pd.read_csv(io.BytesIO(file_content))
-        
         # Initialize data expander
         provider = data.get('provider', 'auto')
         expander = DataExpander(openrouter_api_key=api_key, model_name=model_name, provider=provider)
@@ -860,39 +1148,26 @@ def expand_dataset():
         current_time = time.strftime("%Y%m%d_%H%M%S")
         expanded_filename = f"expanded_{current_time}_{file_name}"
         
-        # Create a temporary file to save the expanded CSV
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv', encoding='utf-8') as temp_file:
-            expanded_df.to_csv(temp_file, index=False)
-            temp_file_path = temp_file.name
+        # Serialize the expanded CSV in memory, no temp file round-trip
+        csv_bytes = to_csv_bytes(expanded_df)
         
         try:
             # Save the expanded file to the database with the correct filename
-            with open(temp_file_path, 'rb') as temp_file:
-                db_fs.save_file_content(temp_file.read(), expanded_filename, DATASET_DIR)
+            db_fs.save_file_content(csv_bytes, expanded_filename, DATASET_DIR)
             print(f"Saved expanded dataset to database: {expanded_filename}")
-            # Clean up the temporary file
-            os.unlink(temp_file_path)
         except Exception as save_error:
             print(f"Error saving to database: {str(save_error)}")
         
-        # Convert DataFrame to JSON for preview
-        preview_data = expanded_df.head(10).to_dict(orient='records')
+        # Columnar preview: one list per row instead of a dict per row
+        preview_data = preview_columnar(expanded_df)
         
         # Get column info with data types
-        columns_with_types = []
-        for col in expanded_df.columns:
-            data_type = str(expanded_df[col].dtype)
-            columns_with_types.append({
-                "name": col,
-                "type": data_type
-            })
+        dtypes = expanded_df.dtypes.astype(str)
+        columns_with_types = [{"name": name, "type": dtype} for name, dtype in zip(dtypes.index, dtypes.values)]
         
         # Generate insights
         insights = generate_data_insights(expanded_df)
         
-        # Prepare CSV data for download
-        clean_csv = expanded_df.to_csv(index=False)
-        
         response_payload = {
             "success": True,
             "message": f"Dataset expanded successfully! Added {num_samples} new rows.",
@@ -902,7 +1177,6 @@ def expand_dataset():
             "original_rows": len(df),
             "expanded_rows": len(expanded_df),
             "insights": insights,
-            "csvData": base64.b64encode(clean_csv.encode('utf-8')).decode('utf-8'),
             "generation_mode": generation_mode
         }
         if warning:
@@ -915,6 +1189,18 @@ def expand_dataset():
         print(error_traceback)
         return jsonify({"error": f"Failed to expand dataset: {str(e)}"}), 500
 
+@app.route('/api/download-generated/<path:filename>', methods=['GET'])
+def download_generated_csv(filename):
+    """Download an expanded/altered CSV by the filename returned from the expand/alter routes"""
+    try:
+        csv_bytes = db_fs.get_file(filename, DATASET_DIR)
+    except FileNotFoundError:
+        csv_bytes = None
+    if csv_bytes is None:
+        return jsonify({"error": f"File {filename} not found in database"}), 404
+    return send_file(io.BytesIO(csv_bytes), mimetype='text/csv', as_attachment=True,
+                     download_name=filename, max_age=0)
+
 @app.route('/api/alter-dataset', methods=['POST'])
 def alter_dataset():
     """Alter dataset by modifying existing data"""
@@ -931,16 +1217,12 @@ def alter_dataset():
     use_llm = bool(api_key) or bool(os.getenv("GOOGLE_API_KEY"))
     
     try:
-        # Check if file exists in database
-        if not db_fs.file_exists(file_name, DATASET_DIR):
+        # Load the DataFrame (cached per file content; one hash lookup when already parsed)
+        try:
+            original_df = load_dataset_df(file_name)
+        except FileNotFoundError:
             return jsonify({"error": f"File {file_name} not found in database"}), 404
         
-        # Get file content from database
-        file_content = db_fs.get_file(file_name, DATASET_DIR)
-        
-        # Read the CSV content into a DataFrame
-        original_df = pd.read_csv(io.BytesIO(file_content))
-        
         # Initialize data expander
         provider = data.get('provider', 'auto')
         expander = DataExpander(openrouter_api_key=api_key, model_name=model_name, provider=provider)
@@ -977,47 +1259,34 @@ def alter_dataset():
         current_time = time.strftime("%Y%m%d_%H%M%S")
         altered_filename = f"altered_{current_time}_{file_name}"
         
-        # Create a temporary file to save the altered CSV
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv', encoding='utf-8') as temp_file:
-            altered_df.to_csv(temp_file, index=False)
-            temp_file_path = temp_file.name
+        # Serialize the altered CSV in memory, no temp file round-trip
+        csv_bytes = to_csv_bytes(altered_df)
         
         try:
             # Save the altered file to the database with the correct filename
-            with open(temp_file_path, 'rb') as temp_file:
-                db_fs.save_file_content(temp_file.read(), altered_filename, DATASET_DIR)
+            db_fs.save_file_content(csv_bytes, altered_filename, DATASET_DIR)
             print(f"Saved altered dataset to database: {altered_filename}")
-            # Clean up the temporary file
-            os.unlink(temp_file_path)
         except Exception as save_error:
             print(f"Error saving to database: {str(save_error)}")
         
-        # Convert DataFrame to JSON for preview
-        preview_data = altered_df.head(10).to_dict(orient='records')
-        original_preview = original_df.head(10).to_dict(orient='records')
+        # Columnar preview: one list per row instead of a dict per row
+        preview_data = preview_columnar(altered_df)
+        original_preview = preview_columnar(original_df)
         
         # Get column info with data types
-        columns_with_types = []
-        for col in altered_df.columns:
-            data_type = str(altered_df[col].dtype)
-            columns_with_types.append({
-                "name": col,
-                "type": data_type
-            })
+        dtypes = altered_df.dtypes.astype(str)
+        columns_with_types = [{"name": name, "type": dtype} for name, dtype in zip(dtypes.index, dtypes.values)]
         
         # Generate insights
         insights = generate_data_insights(altered_df)
         
         # Check for changes
         changes = {
-            "columns_added": list(set(altered_df.columns) - set(original_df.columns)),
-            "columns_removed": list(set(original_df.columns) - set(altered_df.columns)),
+            "columns_added": altered_df.columns.difference(original_df.columns, sort=False).tolist(),
+            "columns_removed": original_df.columns.difference(altered_df.columns, sort=False).tolist(),
             "row_count_changed": len(altered_df) != len(original_df)
         }
         
-        # Prepare CSV data for download
-        clean_csv = altered_df.to_csv(index=False)
-        
         response_payload = {
             "success": True,
             "message": f"Dataset altered successfully!",
@@ -1029,7 +1298,6 @@ def alter_dataset():
             "altered_rows": len(altered_df),
             "changes": changes,
             "insights": insights,
-            "csvData": base64.b64encode(clean_csv.encode('utf-8')).decode('utf-8'),
             "generation_mode": generation_mode
         }
         if warning:
@@ -1042,6 +1310,19 @@ def alter_dataset():
         print(error_traceback)
         return jsonify({"error": f"Failed to alter dataset: {str(e)}"}), 500
 
+# Health checks are polled; reuse the dataset count for a few seconds
+HEALTH_COUNT_TTL_SECONDS = 5
+_health_count = (0.0, 0)  # (fetched_at, csv count)
+
+def count_csv_datasets():
+    """Number of CSV datasets in the database, cached for HEALTH_COUNT_TTL_SECONDS"""
+    global _health_count
+    fetched_at, count = _health_count
+    if not fetched_at or time.monotonic() - fetched_at >= HEALTH_COUNT_TTL_SECONDS:
+        count = sum(1 for f in db_fs.list_files(DATASET_DIR) if f.endswith('.csv'))
+        _health_count = (time.monotonic(), count)
+    return count
+
 @app.route('/api/datasets-health', methods=['GET'])
 def api_health_check():
     """Check server health and API status"""
@@ -1057,8 +1338,7 @@ def api_health_check():
     
     # Count datasets
     try:
-        csv_count = len([f for f in db_fs.list_files(DATASET_DIR) if f.endswith('.csv')])
-        status["storage"]["total_datasets"] = csv_count
+        status["storage"]["total_datasets"] = count_csv_datasets()
     except Exception as e:
         status["storage"]["error"] = str(e)
     
@@ -1074,7 +1354,7 @@ def process():
         task_type = request.form.get('task_type', 'classification')
         text_prompt = request.form.get('text_prompt', '')
         
-        logger.info(f"Processing request - Task Type: {task_type}")
+        logger.info("Processing request - Task Type: %s", task_type)
         
         # Initialize variables
         df = None
@@ -1087,8 +1367,9 @@ def process():
         if 'file' in request.files and request.files['file'].filename != '':
             file = request.files['file']
 
-            for existing_file in os.listdir(DATASETS_DIR):
-             os.remove(os.path.join(DATASETS_DIR, existing_file))
+            # Clear old files in one call (a single DELETE under the database patches)
+            shutil.rmtree(DATASETS_DIR, ignore_errors=True)
+            os.makedirs(DATASETS_DIR, exist_ok=True)
     
     # Save the file directly to DATASETS_DIR instead of TEMP_DIR
             file_path = os.path.join(DATASETS_DIR, file.filename)
@@ -1098,11 +1379,11 @@ def process():
             detected_task_type, df_loaded = auto_detect_task_type(file_path)
             df = df_loaded  # Use the loaded dataframe from auto-detection
             
-            logger.info(f"Auto-detected task type for uploaded file: {detected_task_type}")
+            logger.info("Auto-detected task type for uploaded file: %s", detected_task_type)
             
             # If detected type differs from user selection, use the detected type
             if detected_task_type and detected_task_type != task_type:
-                logger.info(f"Changing task type from {task_type} to {detected_task_type} based on file analysis")
+                logger.info("Changing task type from %s to %s based on file analysis", task_type, detected_task_type)
                 task_type = detected_task_type
         
         # Check if a folder zip was uploaded
@@ -1129,13 +1410,13 @@ def process():
                 
             if kaggle_file:
                 df = pd.read_csv(kaggle_file)
-                logger.info(f"Dataset downloaded from Kaggle: {kaggle_file}")
+                logger.info("Dataset downloaded from Kaggle: %s", kaggle_file)
                 
                 # Use detected task type if available
                 if detected_task_type:
-                    logger.info(f"Auto-detected task type for Kaggle dataset: {detected_task_type}")
+                    logger.info("Auto-detected task type for Kaggle dataset: %s", detected_task_type)
                     if detected_task_type != task_type:
-                        logger.info(f"Changing task type from {task_type} to {detected_task_type} based on dataset analysis")
+                        logger.info("Changing task type from %s to %s based on dataset analysis", task_type, detected_task_type)
                         task_type = detected_task_type
             else:
                 # If Kaggle fails, generate synthetic data
@@ -1153,9 +1434,9 @@ def process():
                 
                 # Use detected task type for generated data if available
                 if detected_task_type:
-                    logger.info(f"Auto-detected task type for generated dataset: {detected_task_type}")
+                    logger.info("Auto-detected task type for generated dataset: %s", detected_task_type)
                     if detected_task_type != task_type:
-                        logger.info(f"Changing task type from {task_type} to {detected_task_type} based on generated data analysis")
+                        logger.info("Changing task type from %s to %s based on generated data analysis", task_type, detected_task_type)
                         task_type = detected_task_type
         
         # Return error if no data was provided
@@ -1175,10 +1456,12 @@ def process():
             # Create visualizations
             visualizations = create_visualization(task_type, y_test, y_pred, best_model, X_test, feature_names, text_prompt)
             
-            # Create data preview
+            # Create data preview; the split orient converts cells column by column
+            # instead of upcasting the whole frame to one object ndarray first
+            preview = df.head(10).to_dict(orient='split', index=False)
             data_preview = {
-                'columns': df.columns.tolist(),
-                'data': df.head(10).values.tolist()
+                'columns': preview['columns'],
+                'data': preview['data']
             }
             
             # Save model
@@ -1361,45 +1644,37 @@ def process():
 def download(filename):
     """Download a file from database or filesystem"""
     try:
-        import tempfile
-        
         # Check if we're using database storage
         if db_fs is not None:
             try:
                 # Get the file from database
-                temp_dir = tempfile.gettempdir()
-                temp_path = os.path.join(temp_dir, filename)
-                
-                # Save to a temporary file
-                content = db_fs.get_file(filename, 'downloads')  # Always use 'downloads' directory name
+                content = get_download_content(filename)  # Always uses the 'downloads' directory
                 
                 if not content:
-                    logger.error(f"File not found in database: {filename}")
+                    logger.error("File not found in database: %s", filename)
                     return jsonify({'error': f'File not found in database: {filename}'}), 404
                 
-                with open(temp_path, 'wb') as f:
-                    f.write(content)
-                
-                # Return the file and remove it after sending
-                return send_file(temp_path, as_attachment=True, download_name=filename)
+                # Serve straight from memory instead of staging to a temp file
+                return send_file(io.BytesIO(content), as_attachment=True, download_name=filename,
+                                 mimetype='application/zip', max_age=0)
             except Exception as db_error:
-                logger.error(f"Database file retrieval error: {str(db_error)}")
+                logger.error("Database file retrieval error: %s", db_error)
                 
                 # Fallback to filesystem approach if database fails
                 if os.path.exists(os.path.join(DOWNLOADS_DIR, filename)):
-                    logger.info(f"Falling back to filesystem for file: {filename}")
+                    logger.info("Falling back to filesystem for file: %s", filename)
                     return send_file(os.path.join(DOWNLOADS_DIR, filename), as_attachment=True)
                 return jsonify({'error': f'Error retrieving file from database: {str(db_error)}'}), 404
         else:
             # Standard filesystem approach
             file_path = os.path.join(DOWNLOADS_DIR, filename)
             if not os.path.exists(file_path):
-                logger.error(f"File not found in filesystem: {file_path}")
+                logger.error("File not found in filesystem: %s", file_path)
                 return jsonify({'error': f'File not found: {filename}'}), 404
                 
             return send_file(file_path, as_attachment=True)
     except Exception as e:
-        logger.error(f"Download error: {str(e)}")
+        logger.error("Download error: %s", e)
         return jsonify({'error': f'Error downloading file: {str(e)}'}), 500
 
 # ===== CSV ANALYSIS ROUTES =====
@@ -1458,6 +1733,70 @@ def health_check():
         "database_connected": db_fs is not None
     })
 
+def process_uploaded_csv(file):
+    """
+    Store one uploaded CSV for analysis and build its preview.
+    Runs on a worker thread so several files in one /upload are parsed concurrently.
+    """
+    filename = file.filename
+    
+    # Read file content directly
+    file.seek(0)
+    file_content = file.read()
+    
+    # Every upload is stored under its own name; re-uploading identical content under
+    # the same name skips the write, only the hash comparison is paid
+    content_hash = db_fs.content_hash(file_content)
+    try:
+        unchanged = db_fs.get_file_hash(filename, 'csv_analysis') == content_hash
+    except Exception as lookup_error:
+        logger.info("Content hash lookup failed: %s", lookup_error)
+        unchanged = False
+    
+    if unchanged:
+        storage_location = 'database'
+    else:
+        # Ensure the csv_analysis directory exists in database
+        try:
+            if not hasattr(db_fs, 'ensure_directory_exists'):
+                # Fallback: try to create a dummy file to ensure directory exists
+                dummy_content = b"directory_marker"
+                db_fs.save_file_content(dummy_content, ".directory_marker", 'csv_analysis')
+        except Exception as dir_error:
+            logger.info("Directory creation attempt: %s", dir_error)
+        
+        # Save to database storage using file content
+        try:
+            db_fs.save_file_content(file_content, filename, 'csv_analysis')
+            storage_location = 'database'
+        except Exception as db_error:
+            # Fallback to filesystem storage
+            logger.info("Database storage failed, using filesystem: %s", db_error)
+            file_path = os.path.join(CSV_ANALYSIS_DIR, filename)
+            with open(file_path, 'wb') as f:
+                f.write(file_content)
+            storage_location = 'filesystem'
+    
+    # Create DataFrame from content for preview
+    df = read_csv_bytes(file_content)
+    
+    # Store the filename, storage location, content hash and the parsed dtypes
+    # for later use; /query passes the dtypes back so reloads skip inference
+    uploaded_csv_files[filename] = {
+        'filename': filename,
+        'storage': storage_location,
+        'hash': content_hash,
+        'dtypes': df.dtypes.astype(str).to_dict()
+    }
+    
+    preview = df.head(3).to_dict('records')
+    columns = df.columns.tolist()
+    return {
+        "filename": filename,
+        "preview": preview,
+        "columns": columns
+    }
+
 @app.route('/upload', methods=['POST'])
 def upload_csv_file():
     """Upload CSV files for analysis"""
@@ -1469,56 +1808,16 @@ def upload_csv_file():
     if not files or files[0].filename == '':
         return jsonify({"success": False, "error": "No files selected"})
     
-    file_info = []
+    csv_files = [file for file in files if file and file.filename.endswith('.csv')]
+    if not csv_files:
+        return jsonify({"success": True, "files": []})
     
-    for file in files:
-        if file and file.filename.endswith('.csv'):
-            filename = file.filename
-            
-            try:
-                # Read file content directly
-                file.seek(0)
-                file_content = file.read()
-                
-                # Ensure the csv_analysis directory exists in database
-                try:
-                    if not hasattr(db_fs, 'ensure_directory_exists'):
-                        # Fallback: try to create a dummy file to ensure directory exists
-                        dummy_content = b"directory_marker"
-                        db_fs.save_file_content(dummy_content, ".directory_marker", 'csv_analysis')
-                except Exception as dir_error:
-                    logger.info(f"Directory creation attempt: {str(dir_error)}")
-                
-                # Save to database storage using file content
-                try:
-                    db_fs.save_file_content(file_content, filename, 'csv_analysis')
-                    storage_location = 'database'
-                except Exception as db_error:
-                    # Fallback to filesystem storage
-                    logger.info(f"Database storage failed, using filesystem: {str(db_error)}")
-                    file_path = os.path.join(CSV_ANALYSIS_DIR, filename)
-                    with open(file_path, 'wb') as f:
-                        f.write(file_content)
-                    storage_location = 'filesystem'
-                
-                # Store filename and storage location for later use
-                uploaded_csv_files[filename] = {
-                    'filename': filename,
-                    'storage': storage_location
-                }
-                
-                # Create DataFrame from content for preview
-                df = pd.read_csv(io.BytesIO(file_content))
-                
-                preview = df.head(3).to_dict('records')
-                columns = df.columns.tolist()
-                file_info.append({
-                    "filename": filename,
-                    "preview": preview,
-                    "columns": columns
-                })
-            except Exception as e:
-                return jsonify({"success": False, "error": f"Error processing CSV: {str(e)}"})
+    try:
+        # pandas' C parser releases the GIL, so per-file parsing overlaps across threads
+        with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as upload_executor:
+            file_info = list(upload_executor.map(process_uploaded_csv, csv_files))
+    except Exception as e:
+        return jsonify({"success": False, "error": f"Error processing CSV: {str(e)}"})
     
     return jsonify({"success": True, "files": file_info})
 
@@ -1541,24 +1840,20 @@ def query_csv():
         # Get file content based on storage method
         file_info = uploaded_csv_files[filename]
         
-        if isinstance(file_info, dict) and file_info.get('storage') == 'filesystem':
-            # Read from filesystem
-            file_path = os.path.join(CSV_ANALYSIS_DIR, filename)
-            if not os.path.exists(file_path):
+        if file_info.get('storage') == 'filesystem':
+            # Read from filesystem; a missing file surfaces as FileNotFoundError
+            # instead of costing an extra exists() probe on every query
+            try:
+                df = pd.read_csv(os.path.join(CSV_ANALYSIS_DIR, filename), dtype=file_info.get('dtypes'))
+            except FileNotFoundError:
                 return jsonify({"success": False, "error": "File not found in filesystem"})
-            df = pd.read_csv(file_path)
         else:
-            # Try database first
+            # Stored in the database at upload time, so the filesystem is never probed
             try:
-                file_content = db_fs.get_file(filename, 'csv_analysis')
-                df = pd.read_csv(io.BytesIO(file_content))
+                file_content = db_fs.get_file(file_info.get('filename', filename), 'csv_analysis')
             except Exception as db_error:
-                # Fallback to filesystem
-                file_path = os.path.join(CSV_ANALYSIS_DIR, filename)
-                if os.path.exists(file_path):
-                    df = pd.read_csv(file_path)
-                else:
-                    return jsonify({"success": False, "error": f"File not found in any storage: {str(db_error)}"})
+                return jsonify({"success": False, "error": f"File not found in database: {str(db_error)}"})
+            df = pd.read_csv(io.BytesIO(file_content), dtype=file_info.get('dtypes'))
         
         # Use the chat_with_csv function with Gemini
         result = chat_with_csv(df, query)
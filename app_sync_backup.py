@@ -1,5 +1,6 @@
 from flask import Flask, request, jsonify, send_file
 import pandas as pd
+import numpy as np
 import os
 import io
 import zipfile
@@ -7,15 +8,17 @@ import shutil
 import uuid
 import json
 import logging
+import heapq
+import importlib.util
 import time
 import threading
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from data_handling import download_kaggle_dataset, generate_dataset_from_text, process_dataset_folder, auto_detect_task_type
 from preprocessing import preprocess_dataset, preprocess_image_dataset
 from model_training import train_models, train_image_classification_model, train_yolo_model, save_best_model
 from visualization import create_visualization, fig_to_base64
-from visualization_cnn import create_cnn_visualization  # Import the CNN visualization module
 from visualization_object import create_object_detection_visualization  # Import the object detection visualization module
 from utils import generate_loading_code, write_requirements_file, create_project_zip
 from db_system_integration import apply_patches
@@ -29,8 +32,12 @@ db_fs = apply_patches()
 BASE_DIR = "ml_system"
 os.makedirs(BASE_DIR, exist_ok=True)
 
-# Create a directory for storing datasets
-DATASETS_DIR = os.path.join(BASE_DIR, 'datasets')
+# Create a directory for storing datasets; with USE_TMPFS=1 the per-job datasets
+# (which are cleared on every run) live in RAM-backed /dev/shm instead of the DB
+if os.getenv('USE_TMPFS', '0') == '1' and os.path.isdir('/dev/shm'):
+    DATASETS_DIR = '/dev/shm/ml_datasets'
+else:
+    DATASETS_DIR = os.path.join(BASE_DIR, 'datasets')
 os.makedirs(DATASETS_DIR, exist_ok=True)
 
 # Create a directory for storing models
@@ -41,6 +48,35 @@ os.makedirs(MODELS_DIR, exist_ok=True)
 DOWNLOADS_DIR = os.path.join(BASE_DIR, 'downloads')
 os.makedirs(DOWNLOADS_DIR, exist_ok=True)
 
+# In-memory LRU cache for project ZIPs served from the database. Generated
+# archives are immutable (uuid-named), so repeat downloads can skip the DB fetch.
+DL_CACHE_BYTES = int(os.getenv('DL_CACHE_MB', '512')) * 1024 * 1024
+DL_CACHE_MAX_ITEM_BYTES = 128 * 1024 * 1024
+_dl_cache = OrderedDict()
+_dl_cache_size = 0
+_dl_cache_lock = threading.Lock()
+
+def get_download_content(filename):
+    """Fetch a file from the downloads directory in the database, via the LRU cache"""
+    global _dl_cache_size
+    with _dl_cache_lock:
+        if filename in _dl_cache:
+            _dl_cache.move_to_end(filename)
+            return _dl_cache[filename]
+
+    content = db_fs.get_file(filename, 'downloads')
+    if not content or len(content) > DL_CACHE_MAX_ITEM_BYTES:
+        return content
+
+    with _dl_cache_lock:
+        if filename not in _dl_cache:
+            _dl_cache[filename] = content
+            _dl_cache_size += len(content)
+            while _dl_cache_size > DL_CACHE_BYTES and _dl_cache:
+                _, evicted = _dl_cache.popitem(last=False)
+                _dl_cache_size -= len(evicted)
+    return content
+
 # Set up logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -51,39 +87,59 @@ console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 logger.addHandler(console_handler)
 
-# Check if TensorFlow is available
-try:
-    import tensorflow as tf
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
+# Check if TensorFlow / YOLO are installed without importing them; the heavy
+# frameworks are only loaded by the image and object detection branches
+TENSORFLOW_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
+YOLO_AVAILABLE = (importlib.util.find_spec('ultralytics') is not None
+                  and importlib.util.find_spec('torch') is not None)
+
+# With USE_ARROW=1 Kaggle CSVs are parsed into pyarrow-backed columns, so string
+# cells in the chunked sampling buffer are not boxed into Python objects
+USE_ARROW = (os.getenv('USE_ARROW', '0') == '1'
+             and importlib.util.find_spec('pyarrow') is not None)
 
-# Check if YOLO is available
+# orjson serializes the large base64 visualization payloads much faster than
+# Flask's default JSON provider; fall back to jsonify when it is not installed
 try:
-    from ultralytics import YOLO
-    import torch
-    YOLO_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    YOLO_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+def ojsonify(payload):
+    """jsonify replacement backed by orjson when available"""
+    if not ORJSON_AVAILABLE:
+        return jsonify(payload)
+    return app.response_class(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+        mimetype='application/json'
+    )
 
 # ===== ASYNC JOB SYSTEM =====
 
+JOB_TTL_SECONDS = 3600  # 1 hour
+
 # Global job storage and thread pool
 jobs = {}  # {job_id: {"status": str, "progress": str, "result": dict, "error": str, "created_at": float}}
 jobs_lock = threading.Lock()
+_jobs_heap = []  # min-heap of (created_at, job_id) so cleanup only touches expired jobs
 executor = ThreadPoolExecutor(max_workers=int(os.getenv('MAX_WORKERS', '2')))
+# Separate pool for project ZIP builds so a job never waits on its own executor
+zip_executor = ThreadPoolExecutor(max_workers=2)
 
 def create_job():
     """Create a new job with unique ID"""
     job_id = str(uuid.uuid4())
+    created_at = time.time()
     with jobs_lock:
         jobs[job_id] = {
             "status": "queued",
             "progress": "Job queued for processing",
             "result": None,
             "error": None,
-            "created_at": time.time()
+            "created_at": created_at
         }
+        heapq.heappush(_jobs_heap, (created_at, job_id))
     return job_id
 
 def update_job_status(job_id, status, progress=None, result=None, error=None):
@@ -105,51 +161,140 @@ def get_job_status(job_id):
 
 def cleanup_old_jobs():
     """Clean up jobs older than 1 hour"""
-    current_time = time.time()
+    cutoff = time.time() - JOB_TTL_SECONDS
+    removed = 0
     with jobs_lock:
-        expired_jobs = [job_id for job_id, job in jobs.items() 
-                       if current_time - job["created_at"] > 3600]  # 1 hour
-        for job_id in expired_jobs:
-            del jobs[job_id]
-    return len(expired_jobs)
+        while _jobs_heap and _jobs_heap[0][0] < cutoff:
+            _, job_id = heapq.heappop(_jobs_heap)
+            if jobs.pop(job_id, None) is not None:
+                removed += 1
+    return removed
+
+def fadvise(f, *advice):
+    """Pass page cache hints for an open file; a no-op for DB-backed or non-POSIX files"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = f.fileno()
+        for flag in advice:
+            os.posix_fadvise(fd, 0, 0, flag)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+
+def arrow_to_numpy(df):
+    """Convert pyarrow-backed columns back to the NumPy dtypes the preprocessing expects"""
+    for col in df.columns:
+        dtype = df[col].dtype
+        if not isinstance(dtype, pd.ArrowDtype):
+            continue
+        has_na = df[col].hasnans
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            df[col] = df[col].to_numpy(dtype=np.float64 if has_na else dtype.numpy_dtype, na_value=np.nan)
+        elif pd.api.types.is_bool_dtype(dtype) and not has_na:
+            df[col] = df[col].to_numpy(dtype=bool)
+        else:
+            df[col] = df[col].to_numpy(dtype=object, na_value=np.nan)
+    return df
+
+def read_csv_sampled(csv_path, max_rows, seed=42):
+    """
+    Read a CSV in chunks of max_rows, keeping a uniform random sample of at most
+    max_rows rows, so peak memory tracks max_rows instead of the file size
+    """
+    rng = np.random.default_rng(seed)
+    sample = None
+    sample_keys = None
+    with open(csv_path, 'rb') as f:
+        # The file is read once front to back: prefetch aggressively, then drop
+        # its pages so long-running workers don't fill the page cache
+        if hasattr(os, 'posix_fadvise'):
+            fadvise(f, os.POSIX_FADV_SEQUENTIAL, os.POSIX_FADV_WILLNEED)
+        read_kwargs = {'dtype_backend': 'pyarrow'} if USE_ARROW else {}
+        for chunk in pd.read_csv(f, chunksize=max_rows, engine='c', low_memory=False, **read_kwargs):
+            # Each row gets a random key; the rows with the smallest keys seen so far
+            # form the sample, which stays uniform over the whole file
+            keys = rng.random(len(chunk))
+            if sample is None:
+                sample, sample_keys = chunk, keys
+            else:
+                sample = pd.concat([sample, chunk], ignore_index=True)
+                sample_keys = np.concatenate([sample_keys, keys])
+            if len(sample) > max_rows:
+                keep = np.argpartition(sample_keys, max_rows)[:max_rows]
+                keep.sort()
+                sample = sample.take(keep).reset_index(drop=True)
+                sample_keys = sample_keys[keep]
+        if hasattr(os, 'posix_fadvise'):
+            fadvise(f, os.POSIX_FADV_DONTNEED)
+    if sample is None:
+        return pd.DataFrame()
+    return arrow_to_numpy(sample) if USE_ARROW else sample
+
+def shrink_dtypes(df):
+    """
+    Downcast numeric feature columns to the smallest fitting dtype and turn low-cardinality
+    text columns into categories, so preprocessing and training move fewer bytes.
+    The target (last) column is left as loaded so regression targets keep float64 precision.
+    """
+    if df is None or df.empty:
+        return df
+    before = df.memory_usage(deep=True).sum()
+    features = df.iloc[:, :-1]
+    for col in features.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in features.select_dtypes(include=['float']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    for col in features.select_dtypes(include=['object']).columns:
+        if df[col].nunique() / len(df) < 0.5:
+            df[col] = df[col].astype('category')
+    after = df.memory_usage(deep=True).sum()
+    logger.info("Downcast dataset dtypes: %d -> %d bytes", before, after)
+    return df
 
 # ===== FLASK ROUTES =====
 
-def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=None):
+def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=None, include_preview=True):
     """Background worker function to process ML training job"""
     try:
         update_job_status(job_id, "running", "Starting ML pipeline...")
         
-        logger.info(f"Processing job {job_id} - Task Type: {task_type}")
+        logger.info("Processing job %s - Task Type: %s", job_id, task_type)
         
         # Initialize variables
         df = None
         dataset_folder = None
         dataset_info = None
         detected_task_type = None
+        downcast = False  # set once shrink_dtypes() has run on df
+        
+        # Dataset size limit for faster processing
+        max_rows = int(os.getenv('MAX_ROWS', '10000'))
         
         # Process uploaded file
         if file_info:
             update_job_status(job_id, "running", "Processing uploaded file...")
             
-            # Clear old files
-            for existing_file in os.listdir(DATASETS_DIR):
-                os.remove(os.path.join(DATASETS_DIR, existing_file))
+            # Clear old files in one call (a single DELETE under the database patches)
+            shutil.rmtree(DATASETS_DIR, ignore_errors=True)
+            os.makedirs(DATASETS_DIR, exist_ok=True)
             
             # Save the file
             file_path = os.path.join(DATASETS_DIR, file_info['filename'])
             with open(file_path, 'wb') as f:
-                f.write(file_info['content'])
+                if hasattr(file_info['content'], 'read'):
+                    shutil.copyfileobj(file_info['content'], f, length=1 << 20)
+                else:
+                    f.write(file_info['content'])
             
             # Auto-detect task type
             detected_task_type, df_loaded = auto_detect_task_type(file_path)
             df = df_loaded
             
-            logger.info(f"Auto-detected task type for uploaded file: {detected_task_type}")
+            logger.info("Auto-detected task type for uploaded file: %s", detected_task_type)
             
             # Use detected type if different
             if detected_task_type and detected_task_type != task_type:
-                logger.info(f"Changing task type from {task_type} to {detected_task_type} based on file analysis")
+                logger.info("Changing task type from %s to %s based on file analysis", task_type, detected_task_type)
                 task_type = detected_task_type
                 update_job_status(job_id, "running", f"Detected task type: {task_type}")
         
@@ -167,7 +312,12 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                 def __init__(self, path):
                     self.path = path
                 def save(self, dest_path):
-                    shutil.copy2(self.path, dest_path)
+                    # Hardlink when source and destination share a filesystem;
+                    # DB-backed ml_system paths fall back to a plain byte copy
+                    try:
+                        os.link(self.path, dest_path)
+                    except (OSError, AttributeError):
+                        shutil.copyfile(self.path, dest_path)
             
             mock_file = MockFile(temp_file_path)
             dataset_info = process_dataset_folder(mock_file, task_type, DATASETS_DIR)
@@ -188,13 +338,14 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                 detected_task_type = None
             
             if kaggle_file:
-                df = pd.read_csv(kaggle_file)
-                logger.info(f"Dataset downloaded from Kaggle: {kaggle_file}")
+                df = shrink_dtypes(read_csv_sampled(kaggle_file, max_rows))
+                downcast = True
+                logger.info("Dataset downloaded from Kaggle: %s", kaggle_file)
                 
                 if detected_task_type:
-                    logger.info(f"Auto-detected task type for Kaggle dataset: {detected_task_type}")
+                    logger.info("Auto-detected task type for Kaggle dataset: %s", detected_task_type)
                     if detected_task_type != task_type:
-                        logger.info(f"Changing task type from {task_type} to {detected_task_type} based on dataset analysis")
+                        logger.info("Changing task type from %s to %s based on dataset analysis", task_type, detected_task_type)
                         task_type = detected_task_type
                         update_job_status(job_id, "running", f"Detected task type: {task_type}")
             else:
@@ -207,49 +358,43 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                 else:
                     df = generation_result
                     detected_task_type = None
+                df = shrink_dtypes(df)
+                downcast = True
                 
                 logger.info("Generated synthetic dataset from text prompt")
                 
                 if detected_task_type:
-                    logger.info(f"Auto-detected task type for generated dataset: {detected_task_type}")
+                    logger.info("Auto-detected task type for generated dataset: %s", detected_task_type)
                     if detected_task_type != task_type:
-                        logger.info(f"Changing task type from {task_type} to {detected_task_type} based on generated data analysis")
+                        logger.info("Changing task type from %s to %s based on generated data analysis", task_type, detected_task_type)
                         task_type = detected_task_type
                         update_job_status(job_id, "running", f"Detected task type: {task_type}")
         else:
             raise ValueError('No data provided. Please upload a file, folder, or provide a text prompt.')
         
         # Apply dataset size limit for faster processing
-        max_rows = int(os.getenv('MAX_ROWS', '10000'))
         if df is not None and len(df) > max_rows:
             update_job_status(job_id, "running", f"Sampling {max_rows} rows from {len(df)} total rows...")
-            df = df.sample(n=max_rows, random_state=42).reset_index(drop=True)
+            # Sorted positional indices let take() copy rows in storage order; no index
+            # rebuild is needed since train_test_split reshuffles rows anyway
+            rng = np.random.default_rng(42)
+            idx = rng.choice(len(df), size=max_rows, replace=False)
+            idx.sort()
+            df = df.take(idx)
         
         # Continue with ML processing
         update_job_status(job_id, "running", "Starting ML training...")
         
         # Regular tabular data processing
-        if df is not None:
-        
-        # Process data and train model
         if df is not None:
             # Preprocess data
-            X_train, X_test, y_train, y_test, preprocessor, feature_names = preprocess_dataset(df, task_type)
+            X_train, X_test, y_train, y_test, preprocessor, feature_names = preprocess_dataset(df, task_type, downcast=downcast)
             
             # Train model
             best_model, best_model_name, best_score, y_pred = train_models(
                 X_train, y_train, X_test, y_test, task_type, MODELS_DIR
             )
             
-            # Create visualizations
-            visualizations = create_visualization(task_type, y_test, y_pred, best_model, X_test, feature_names, text_prompt)
-            
-            # Create data preview
-            data_preview = {
-                'columns': df.columns.tolist(),
-                'data': df.head(10).values.tolist()
-            }
-            
             # Save model
             model_file = "best_model.pkl"
             save_best_model(best_model, MODELS_DIR)
@@ -260,11 +405,26 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
             # Write requirements file
             write_requirements_file(DOWNLOADS_DIR)
             
-            # Create project ZIP
-            zip_path = create_project_zip(model_file, MODELS_DIR, DOWNLOADS_DIR)
+            # Build the project ZIP in the background while the plots render
+            zip_future = zip_executor.submit(create_project_zip, model_file, MODELS_DIR, DOWNLOADS_DIR)
+            
+            # Create visualizations
+            visualizations = create_visualization(task_type, y_test, y_pred, best_model, X_test, feature_names, text_prompt)
+            
+            # Create data preview; the split orient converts cells column by column
+            # instead of upcasting the whole frame to one object ndarray first
+            data_preview = None
+            if include_preview:
+                preview = df.iloc[:10].to_dict(orient='split', index=False)
+                data_preview = {
+                    'columns': preview['columns'],
+                    'data': preview['data']
+                }
+            
+            zip_path = zip_future.result()
             
             # Return results
-            return jsonify({
+            return ojsonify({
                 'success': True,
                 'detected_task_type': task_type,  # Add detected task type
                 'model_info': {
@@ -284,7 +444,7 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
             if task_type == 'image_classification':
                 # Check if TensorFlow is available
                 if not TENSORFLOW_AVAILABLE:
-                    return jsonify({
+                    return ojsonify({
                         'error': 'TensorFlow is required for image classification but not available. Please install TensorFlow.'
                     }), 400
                 
@@ -312,6 +472,7 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                     )
                     
                     # Create CNN visualizations using the specialized module
+                    from visualization_cnn import create_cnn_visualization
                     visualizations = create_cnn_visualization(
                         best_model,
                         training_generator,
@@ -333,7 +494,7 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                     zip_path = create_project_zip(model_file, MODELS_DIR, DOWNLOADS_DIR, is_image_model=True)
                     
                     # Return results with visualizations
-                    return jsonify({
+                    return ojsonify({
                         'success': True,
                         'detected_task_type': task_type,  # Add detected task type
                         'model_info': {
@@ -350,7 +511,7 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                 except Exception as e:
                     import traceback
                     traceback.print_exc()
-                    return jsonify({
+                    return ojsonify({
                         'error': f'Error processing image classification dataset: {str(e)}'
                     }), 500
             
@@ -358,7 +519,7 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
             elif task_type == "object_detection":
                 # Check if YOLO is available
                 if not YOLO_AVAILABLE:
-                    return jsonify({
+                    return ojsonify({
                         'error': 'YOLO is required for object detection but not available. Please install ultralytics and torch.'
                     }), 400
                 
@@ -389,7 +550,7 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                     zip_path = create_project_zip(model_file, MODELS_DIR, DOWNLOADS_DIR, is_object_detection=True)
                     
                     # Return results with enhanced model info
-                    return jsonify({
+                    return ojsonify({
                         'success': True,
                         'detected_task_type': task_type,  # Add detected task type
                         'model_info': {
@@ -409,67 +570,59 @@ def process_ml_job(job_id, task_type, text_prompt, file_info=None, folder_info=N
                 except Exception as e:
                     import traceback
                     traceback.print_exc()
-                    return jsonify({
+                    return ojsonify({
                         'error': f'Error processing object detection dataset: {str(e)}'
                     }), 500
             
             else:
-                return jsonify({
+                return ojsonify({
                     'error': f'Task type {task_type} not supported for the uploaded dataset.'
                 }), 400
         
         else:
-            return jsonify({'error': 'Failed to process data.'}), 500
+            return ojsonify({'error': 'Failed to process data.'}), 500
     
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}), 500
 
 @app.route('/api/download/<filename>', methods=['GET'])
 def download(filename):
     """Download a file from database or filesystem"""
     try:
-        import tempfile
-        
         # Check if we're using database storage
         if db_fs is not None:
             try:
                 # Get the file from database
-                temp_dir = tempfile.gettempdir()
-                temp_path = os.path.join(temp_dir, filename)
-                
-                # Save to a temporary file
-                content = db_fs.get_file(filename, 'downloads')  # Always use 'downloads' directory name
+                content = get_download_content(filename)  # Always uses the 'downloads' directory
                 
                 if not content:
-                    logger.error(f"File not found in database: {filename}")
-                    return jsonify({'error': f'File not found in database: {filename}'}), 404
-                
-                with open(temp_path, 'wb') as f:
-                    f.write(content)
+                    logger.error("File not found in database: %s", filename)
+                    return ojsonify({'error': f'File not found in database: {filename}'}), 404
                 
-                # Return the file and remove it after sending
-                return send_file(temp_path, as_attachment=True, download_name=filename)
+                # Serve straight from memory instead of staging to a temp file
+                return send_file(io.BytesIO(content), as_attachment=True, download_name=filename,
+                                 mimetype='application/zip', max_age=0)
             except Exception as db_error:
-                logger.error(f"Database file retrieval error: {str(db_error)}")
+                logger.error("Database file retrieval error: %s", db_error)
                 
                 # Fallback to filesystem approach if database fails
                 if os.path.exists(os.path.join(DOWNLOADS_DIR, filename)):
-                    logger.info(f"Falling back to filesystem for file: {filename}")
+                    logger.info("Falling back to filesystem for file: %s", filename)
                     return send_file(os.path.join(DOWNLOADS_DIR, filename), as_attachment=True)
-                return jsonify({'error': f'Error retrieving file from database: {str(db_error)}'}), 404
+                return ojsonify({'error': f'Error retrieving file from database: {str(db_error)}'}), 404
         else:
             # Standard filesystem approach
             file_path = os.path.join(DOWNLOADS_DIR, filename)
             if not os.path.exists(file_path):
-                logger.error(f"File not found in filesystem: {file_path}")
-                return jsonify({'error': f'File not found: {filename}'}), 404
+                logger.error("File not found in filesystem: %s", file_path)
+                return ojsonify({'error': f'File not found: {filename}'}), 404
                 
             return send_file(file_path, as_attachment=True)
     except Exception as e:
-        logger.error(f"Download error: {str(e)}")
-        return jsonify({'error': f'Error downloading file: {str(e)}'}), 500
+        logger.error("Download error: %s", e)
+        return ojsonify({'error': f'Error downloading file: {str(e)}'}), 500
 
     
 if __name__ == '__main__':
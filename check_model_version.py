@@ -1,5 +1,6 @@
 
 import os
+import asyncio
 import google.generativeai as genai
 from dotenv import load_dotenv
 
@@ -12,26 +13,37 @@ if not api_key:
 
 genai.configure(api_key=api_key)
 
+MODELS_TO_TEST = ["gemini-2.5-flash", "gemini-2.0-flash-exp"]
+
+def list_generate_models():
+    return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+
+async def test_model(name):
+    model = genai.GenerativeModel(name)
+    return await asyncio.to_thread(model.generate_content, "Hello")
+
+async def run_probes():
+    # The probes are independent network calls, so run them concurrently
+    return await asyncio.gather(
+        asyncio.to_thread(list_generate_models),
+        *(test_model(name) for name in MODELS_TO_TEST),
+        return_exceptions=True
+    )
+
+models_result, *test_results = asyncio.run(run_probes())
+
 print("--- Listing Available Models ---")
-try:
-    for m in genai.list_models():
-        if 'generateContent' in m.supported_generation_methods:
-            print(f" - {m.name}")
-except Exception as e:
-    print(f"Error listing models: {e}")
-
-print("\n--- Testing gemini-2.5-flash ---")
-try:
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    resp = model.generate_content("Hello")
-    print(f"Success! Response: {resp.text}")
-except Exception as e:
-    print(f"Failed to use gemini-2.5-flash: {e}")
-
-print("\n--- Testing gemini-2.0-flash-exp (just in case) ---")
-try:
-    model = genai.GenerativeModel("gemini-2.0-flash-exp")
-    resp = model.generate_content("Hello")
-    print(f"Success! Response: {resp.text}")
-except Exception as e:
-    print(f"Failed to use gemini-2.0-flash-exp: {e}")
+if isinstance(models_result, Exception):
+    print(f"Error listing models: {models_result}")
+else:
+    for name in models_result:
+        print(f" - {name}")
+
+for name, result in zip(MODELS_TO_TEST, test_results):
+    print(f"\n--- Testing {name} ---")
+    try:
+        if isinstance(result, Exception):
+            raise result
+        print(f"Success! Response: {result.text}")
+    except Exception as e:
+        print(f"Failed to use {name}: {e}")
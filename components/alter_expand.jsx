@@ -4,6 +4,13 @@ import { useEffect, useState } from 'react';
 import Link from 'next/link';
 
 
+// expand/alter previews arrive columnar ({ columns, rows }); the tables below index rows by column name
+const previewRecords = (preview) => {
+  if (!preview || Array.isArray(preview)) return preview;
+  const { columns = [], rows = [] } = preview;
+  return rows.map((row) => Object.fromEntries(columns.map((col, i) => [col, row[i]])));
+};
+
 const DataExpanderTool = () => {
   const [datasets, setDatasets] = useState([]);
   const [selectedDataset, setSelectedDataset] = useState('');
@@ -178,7 +185,12 @@ const DataExpanderTool = () => {
       const data = await response.json();
       
       if (data.success) {
-        setResult(data);
+        setResult({
+          ...data,
+          previewData: previewRecords(data.previewData),
+          originalPreviewData: previewRecords(data.originalPreviewData),
+          alteredPreviewData: previewRecords(data.alteredPreviewData),
+        });
         await loadDatasets(); // Refresh dataset list
       } else {
         // Enhanced error handling for common issues
@@ -201,19 +213,29 @@ const DataExpanderTool = () => {
     }
   };
 
-  const downloadResult = () => {
-    if (!result?.csvData) return;
-
-    const csvContent = atob(result.csvData);
-    const blob = new Blob([csvContent], { type: 'text/csv' });
-    const url = window.URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = `${mode}_result.csv`;
-    document.body.appendChild(a);
-    a.click();
-    document.body.removeChild(a);
-    window.URL.revokeObjectURL(url);
+  const downloadResult = async () => {
+    const savedName = mode === 'expand' ? result?.expanded_filename : result?.altered_filename;
+    if (!savedName) return;
+
+    try {
+      // The expand/alter routes save the result under this name; fetch the raw bytes
+      const response = await fetch(`${API_BASE}/download-generated/${encodeURIComponent(savedName)}`);
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.error || `HTTP ${response.status}`);
+      }
+      const blob = await response.blob();
+      const url = window.URL.createObjectURL(blob);
+      const a = document.createElement('a');
+      a.href = url;
+      a.download = `${mode}_result.csv`;
+      document.body.appendChild(a);
+      a.click();
+      document.body.removeChild(a);
+      window.URL.revokeObjectURL(url);
+    } catch (err) {
+      setError('Download failed: ' + err.message);
+    }
   };
 
   return (
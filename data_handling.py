@@ -1,5 +1,6 @@
 import os
 import io
+import hashlib
 import zipfile
 import shutil
 import pandas as pd
@@ -10,7 +11,9 @@ import yaml
 import logging
 from scipy import stats
 import tempfile
+import uuid
 import csv
+from collections import OrderedDict
 from db_file_system import DBFileSystem
 
 # Initialize the database file system
@@ -108,6 +111,35 @@ def download_kaggle_dataset(query, datasets_dir):
         print(f"Error searching for Kaggle datasets: {e}")
         return None, None
 
+# Task types detected per dataset fingerprint, oldest first. Only the verdict is
+# kept: the DataFrame itself is mutated in place by preprocess_dataset.
+_task_type_cache = OrderedDict()
+_TASK_TYPE_CACHE_SIZE = 128
+_KDE_MAX_SAMPLES = 10000
+
+def _dataset_fingerprint(content_or_path):
+    """
+    Cheap content fingerprint for a dataset.
+    In-memory content is hashed in full; on-disk files hash the first 64KB
+    together with size and mtime so edits in place invalidate the entry.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(content_or_path, (bytes, bytearray)):
+        h.update(content_or_path)
+    else:
+        st = os.stat(content_or_path)
+        h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+        with open(content_or_path, 'rb') as f:
+            h.update(f.read(65536))
+    return h.hexdigest()
+
+def _remember_task_type(fingerprint, task_type):
+    """Store a detected task type, evicting the least recently added entries"""
+    _task_type_cache[fingerprint] = task_type
+    _task_type_cache.move_to_end(fingerprint)
+    while len(_task_type_cache) > _TASK_TYPE_CACHE_SIZE:
+        _task_type_cache.popitem(last=False)
+
 def auto_detect_task_type(csv_path):
     """
     Analyze the CSV to detect if it's more suitable for regression or classification
@@ -246,80 +278,14 @@ def auto_detect_task_type(csv_path):
             # Load directly from file path
             df = try_read_csv_with_encoding(csv_path, is_content=False)
         
-        # Get the target column (last column)
-        target_col = df.columns[-1]
-        target_values = df[target_col].dropna()
-        
-        # If target is empty, get second-to-last column in case of ordering issues
-        if len(target_values) == 0 and len(df.columns) > 1:
-            target_col = df.columns[-2]
-            target_values = df[target_col].dropna()
-        
-        # Get unique values in target
-        unique_values = target_values.unique()
-        num_unique = len(unique_values)
-        
-        # Check if the target has numerical values
-        is_numeric = pd.api.types.is_numeric_dtype(target_values)
-        
-        if is_numeric:
-            # If numeric, check various indicators
-            value_range = target_values.max() - target_values.min()
-            fraction_unique = num_unique / len(target_values)
-            
-            # Check if values are mostly integers
-            is_mostly_integer = np.mean([float(x).is_integer() for x in target_values if not pd.isna(x)]) > 0.9
-            
-            # Check if distribution is continuous (using KDE)
-            try:
-                kde = stats.gaussian_kde(target_values)
-                x = np.linspace(target_values.min(), target_values.max(), 1000)
-                y = kde(x)
-                continuity_score = np.std(y) / np.mean(y) if np.mean(y) > 0 else 0
-            except:
-                continuity_score = 0
-            
-            # Check correlation with other numerical features
-            numerical_cols = df.select_dtypes(include=['float64', 'int64']).columns
-            avg_correlation = 0
-            if len(numerical_cols) > 1:
-                correlations = []
-                for col in numerical_cols:
-                    if col != target_col:
-                        corr = abs(df[col].corr(df[target_col]))
-                        if not pd.isna(corr):
-                            correlations.append(corr)
-                if correlations:
-                    avg_correlation = sum(correlations) / len(correlations)
-            
-            # Determine if regression or classification based on multiple factors
-            regression_score = 0
-            regression_score += 1 if fraction_unique > 0.4 else 0
-            regression_score += 1 if not is_mostly_integer else 0
-            regression_score += 1 if value_range > 10 else 0
-            regression_score += 1 if continuity_score < 2 else 0
-            regression_score += 1 if avg_correlation > 0.3 else 0
-            
-            if regression_score >= 3:
-                return "regression", df
-            else:
-                return "classification", df
-        else:
-            # If target is not numeric, it's likely classification
-            # Check for NLP task - if there are text columns with more than a few words
-            text_features = False
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    # Check if column contains longer text (average > 15 chars)
-                    sample = df[col].dropna().astype(str).sample(min(100, len(df)))
-                    if sample.str.len().mean() > 15:
-                        text_features = True
-                        break
-            
-            if text_features:
-                return "nlp", df
-            else:
-                return "classification", df
+        # Datasets seen before (same bytes) reuse the earlier verdict and skip
+        # the KDE / correlation scan in _detect_task_type_from_df
+        fingerprint = _dataset_fingerprint(content if 'ml_system' in csv_path else csv_path)
+        task_type = _task_type_cache.get(fingerprint)
+        if task_type is None:
+            task_type = _detect_task_type_from_df(df)
+            _remember_task_type(fingerprint, task_type)
+        return task_type, df
     except Exception as e:
         print(f"Error in auto_detect_task_type: {e}")
         # Default to classification if detection fails
@@ -347,6 +313,94 @@ def auto_detect_task_type(csv_path):
             print(f"Fallback CSV reading also failed: {fallback_e}")
             raise ValueError(f"Cannot read CSV file: {e}")
 
+def _continuity_score(values, max_samples=_KDE_MAX_SAMPLES):
+    """
+    Spread of a KDE of the target over its range (std/mean of the density on a 1000-point grid).
+    Evaluating the KDE is O(n) per grid point, so targets longer than max_samples are fitted
+    on a fixed-seed sample with the full target's bandwidth. The sampled score stays within a
+    few percent of the full-data one, so only targets scoring right at the regression
+    threshold of 2 can get a different verdict.
+    """
+    try:
+        kde_values = values
+        if len(kde_values) > max_samples:
+            kde_values = np.random.default_rng(42).choice(kde_values, max_samples, replace=False)
+        # Scott's factor for the full length, so a sample is not smoothed more than the target
+        kde = stats.gaussian_kde(kde_values, bw_method=len(values) ** (-1 / 5))
+        x = np.linspace(values.min(), values.max(), 1000)
+        y = kde(x)
+        return np.std(y) / np.mean(y) if np.mean(y) > 0 else 0
+    except:
+        return 0
+
+def _detect_task_type_from_df(df):
+    """Score a loaded DataFrame and return the most suitable task type"""
+    # Get the target column (last column)
+    target_col = df.columns[-1]
+    target_values = df[target_col].dropna()
+    
+    # If target is empty, get second-to-last column in case of ordering issues
+    if len(target_values) == 0 and len(df.columns) > 1:
+        target_col = df.columns[-2]
+        target_values = df[target_col].dropna()
+    
+    # Get unique values in target
+    unique_values = target_values.unique()
+    num_unique = len(unique_values)
+    
+    # Check if the target has numerical values
+    is_numeric = pd.api.types.is_numeric_dtype(target_values)
+    
+    if is_numeric:
+        # If numeric, check various indicators
+        value_range = target_values.max() - target_values.min()
+        fraction_unique = num_unique / len(target_values)
+        
+        # Check if values are mostly integers (vectorized over the float64 values)
+        values = target_values.to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            is_mostly_integer = np.mean(np.mod(values, 1) == 0) > 0.9
+        
+        # Check if distribution is continuous (using KDE)
+        continuity_score = _continuity_score(values)
+        
+        # Check correlation with other numerical features
+        numerical_cols = df.select_dtypes(include=['float64', 'int64']).columns
+        avg_correlation = 0
+        if len(numerical_cols) > 1:
+            correlations = df[numerical_cols].drop(columns=[target_col], errors='ignore').corrwith(df[target_col]).abs().dropna()
+            if len(correlations):
+                avg_correlation = correlations.mean()
+        
+        # Determine if regression or classification based on multiple factors
+        regression_score = 0
+        regression_score += 1 if fraction_unique > 0.4 else 0
+        regression_score += 1 if not is_mostly_integer else 0
+        regression_score += 1 if value_range > 10 else 0
+        regression_score += 1 if continuity_score < 2 else 0
+        regression_score += 1 if avg_correlation > 0.3 else 0
+        
+        if regression_score >= 3:
+            return "regression"
+        else:
+            return "classification"
+    else:
+        # If target is not numeric, it's likely classification
+        # Check for NLP task - if there are text columns with more than a few words
+        text_features = False
+        for col in df.columns:
+            if df[col].dtype == 'object':
+                # Check if column contains longer text (average > 15 chars)
+                sample = df[col].dropna().astype(str).sample(min(100, len(df)))
+                if sample.str.len().mean() > 15:
+                    text_features = True
+                    break
+        
+        if text_features:
+            return "nlp"
+        else:
+            return "classification"
+
 def get_gemini_task_type_opinion(df, query):
     """
     Use Gemini to analyze the dataset and determine the most appropriate task type
@@ -420,6 +474,10 @@ def determine_final_task_type(detected_type, gemini_type):
     # as it might catch contextual clues the statistical analysis missed
     return gemini_type
 
+def _generated_dataset_name():
+    """Unique file name for a generated dataset (these used to be saved under their temp file's name)"""
+    return f"generated_{uuid.uuid4().hex[:12]}.csv"
+
 def generate_dataset_from_text(text):
     """Generate a synthetic dataset based on text description"""
     if GEMINI_AVAILABLE:
@@ -436,16 +494,8 @@ def generate_dataset_from_text(text):
             # Auto-detect task type for the generated dataset
             detected_task_type, _ = auto_detect_task_type(io.StringIO(csv_data))
             
-            # Save to database
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
-            try:
-                df.to_csv(temp_file.name, index=False)
-                temp_file.close()
-                db_fs.save_file(temp_file.name, 'datasets')
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file.name):
-                    os.remove(temp_file.name)
+            # Save to database straight from memory
+            db_fs.save_file_content(df.to_csv(index=False).encode('utf-8'), _generated_dataset_name(), 'datasets')
             
             return df, detected_task_type
         except Exception as e:
@@ -468,16 +518,8 @@ def generate_dataset_from_text(text):
     
     df = pd.DataFrame(data, columns=columns)
     
-    # Save to database
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
-    try:
-        df.to_csv(temp_file.name, index=False)
-        temp_file.close()
-        db_fs.save_file(temp_file.name, 'datasets')
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file.name):
-            os.remove(temp_file.name)
+    # Save to database straight from memory
+    db_fs.save_file_content(df.to_csv(index=False).encode('utf-8'), _generated_dataset_name(), 'datasets')
     
     return df, "classification"  # Default task type for randomly generated data
 
@@ -947,11 +989,11 @@ def process_yolo_dataset_with_db(temp_dir, datasets_dir):
                     arcname = os.path.relpath(file_path, temp_dir)
                     zipf.write(file_path, arcname)
     
-    # Save the zip to database
-    db_fs.save_file(result_zip_path, 'datasets')
-    
-    # Also save the data.yaml file separately for easy access
-    db_fs.save_file(yaml_path, 'datasets')
+    # Save the zip to database, and the data.yaml file separately for easy access,
+    # in one transaction
+    with db_fs.transaction():
+        db_fs.save_file(result_zip_path, 'datasets')
+        db_fs.save_file(yaml_path, 'datasets')
     
     # Add dataset statistics
     folder_structure.append("└── Dataset Statistics:")
@@ -2,12 +2,26 @@
 
 import sqlite3
 import os
+import threading
+import hashlib
 import tempfile
 import datetime
 import shutil
 import mimetypes
 from contextlib import contextmanager
 
+class _DeferredCommitConnection:
+    """sqlite3 connection whose commit() is left to the enclosing DBFileSystem.transaction()"""
+    
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def commit(self):
+        pass
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
 class DBFileSystem:
     """
     A class that provides file system-like operations but uses a SQLite database
@@ -17,6 +31,7 @@ class DBFileSystem:
     def __init__(self, db_path="ml_system.db"):
         """Initialize the database file system with the given database path"""
         self.db_path = db_path
+        self._local = threading.local()  # conn: the connection of this thread's open transaction()
         self._initialize_db()
     
     def _initialize_db(self):
@@ -24,6 +39,10 @@ class DBFileSystem:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # Write-ahead logging: readers don't block the writer, and with synchronous=NORMAL
+        # (set per connection) commits no longer fsync; the mode is stored in the file
+        cursor.execute('PRAGMA journal_mode=WAL')
+        
         # Create directories table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS directories (
@@ -42,15 +61,23 @@ class DBFileSystem:
           directory_id INTEGER NOT NULL,
           content BLOB,
           mime_type TEXT,
+          content_hash TEXT,
           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
           updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (directory_id) REFERENCES directories(id)
         )
         ''')
         
+        # Databases created before content hashing was added lack the column
+        cursor.execute('PRAGMA table_info(files)')
+        if 'content_hash' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE files ADD COLUMN content_hash TEXT')
+        
         # Create indexes
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_directory ON files(directory_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_directories_parent ON directories(parent_id)')
+        # content_hash is only read by filename lookups; drop the unused hash index older databases have
+        cursor.execute('DROP INDEX IF EXISTS idx_files_content_hash')
         
         # Create root directory
         cursor.execute('INSERT OR IGNORE INTO directories (id, name, parent_id) VALUES (1, "ml_system", NULL)')
@@ -63,15 +90,50 @@ class DBFileSystem:
         conn.commit()
         conn.close()
     
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
+        """Context manager for database connections (shares the open transaction() connection, if any)"""
+        tx_conn = getattr(self._local, 'conn', None)
+        if tx_conn is not None:
+            yield tx_conn
+            return
+        
+        conn = self._connect()
         try:
             yield conn
         finally:
             conn.close()
     
+    @contextmanager
+    def transaction(self):
+        """
+        Run the writes in the block on one connection with a single commit
+        
+        Applies to calls made from the current thread. Commits made by the individual
+        methods are deferred to the end of the block, and everything is rolled back if
+        the block raises. Nested transaction() blocks join the outer one.
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield
+            return
+        
+        conn = self._connect()
+        self._local.conn = _DeferredCommitConnection(conn)
+        try:
+            yield
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            conn.close()
+    
     def _get_directory_id(self, directory_name):
         """Get the ID of a directory by name"""
         with self._get_connection() as conn:
@@ -157,6 +219,7 @@ class DBFileSystem:
         """
         # Get mime type
         mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        content_hash = self.content_hash(content)
         
         # Get directory ID
         directory_id = self._get_directory_id(directory_name)
@@ -174,15 +237,15 @@ class DBFileSystem:
                 file_id = existing_file[0]
                 cursor.execute('''
                 UPDATE files 
-                SET content = ?, mime_type = ?, updated_at = ?
+                SET content = ?, mime_type = ?, content_hash = ?, updated_at = ?
                 WHERE id = ?
-                ''', (content, mime_type, datetime.datetime.now(), file_id))
+                ''', (content, mime_type, content_hash, datetime.datetime.now(), file_id))
             else:
                 # Insert new file
                 cursor.execute('''
-                INSERT INTO files (filename, directory_id, content, mime_type)
-                VALUES (?, ?, ?, ?)
-                ''', (filename, directory_id, content, mime_type))
+                INSERT INTO files (filename, directory_id, content, mime_type, content_hash)
+                VALUES (?, ?, ?, ?, ?)
+                ''', (filename, directory_id, content, mime_type, content_hash))
                 file_id = cursor.lastrowid
             
             conn.commit()
@@ -229,6 +292,37 @@ class DBFileSystem:
         
         return content
     
+    def get_file_hash(self, filename, directory_name):
+        """
+        Look up the stored content hash of a file without reading its content
+        
+        Returns:
+            content_hash: BLAKE2b-128 hex digest, or None for rows saved before hashes were stored
+        
+        Raises:
+            FileNotFoundError: if the file does not exist
+        """
+        directory_id = self._get_directory_id(directory_name)
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+            SELECT content_hash FROM files 
+            WHERE filename = ? AND directory_id = ?
+            ''', (filename, directory_id))
+            
+            result = cursor.fetchone()
+            if not result:
+                raise FileNotFoundError(f"File not found: {filename} in {directory_name}")
+            
+            return result[0]
+    
+    @staticmethod
+    def content_hash(content):
+        """Return the BLAKE2b-128 hex digest used to identify file content"""
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+    
     def list_files(self, directory_name):
         """List all files in a directory"""
         directory_id = self._get_directory_id(directory_name)
@@ -244,6 +338,21 @@ class DBFileSystem:
             
             return [row[0] for row in cursor.fetchall()]
     
+    def list_files_with_sizes(self, directory_name):
+        """List (filename, size in bytes) for all files in a directory without reading their content"""
+        directory_id = self._get_directory_id(directory_name)
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+            SELECT filename, length(content) FROM files 
+            WHERE directory_id = ?
+            ORDER BY filename
+            ''', (directory_id,))
+            
+            return [(row[0], row[1] or 0) for row in cursor.fetchall()]
+    
     def clear_directory(self, directory_name):
         """Remove all files from a directory"""
         directory_id = self._get_directory_id(directory_name)
@@ -13,18 +13,14 @@ def debug_database():
     
     try:
         # List all files in database
-        files = db_fs.list_files(DATASET_DIR)
+        files_with_sizes = db_fs.list_files_with_sizes(DATASET_DIR)
+        files = [file for file, _ in files_with_sizes]
         print(f'📁 Files in database ({len(files)} total):')
         
         if files:
-            for i, file in enumerate(files, 1):
-                try:
-                    # Get file size
-                    content = db_fs.get_file(file, DATASET_DIR)
-                    size_kb = len(content) / 1024
-                    print(f'  {i:2d}. {file} ({size_kb:.1f} KB)')
-                except Exception as e:
-                    print(f'  {i:2d}. {file} (error reading: {e})')
+            # Sizes come from the listing query; no need to fetch each file
+            for i, (file, size) in enumerate(files_with_sizes, 1):
+                print(f'  {i:2d}. {file} ({size / 1024:.1f} KB)')
         else:
             print('  ❌ No files found in database')
         
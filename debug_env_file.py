@@ -1,6 +1,8 @@
 
 import os
 
+from charset_normalizer import from_bytes
+
 def check_file(filename):
     print(f"Checking {filename}...")
     if not os.path.exists(filename):
@@ -11,14 +13,12 @@ def check_file(filename):
         with open(filename, 'rb') as f:
             raw = f.read()
             print(f"File size: {len(raw)} bytes")
-            # Try to decode as utf-8
-            try:
-                content = raw.decode('utf-8')
-                print("Decoded as UTF-8 successfully.")
-            except UnicodeDecodeError:
-                print("Failed to decode as UTF-8. Trying to detect encoding...")
-                content = raw.decode('utf-16') if b'\x00' in raw else raw.decode('cp1252', errors='ignore')
-                print("Decoded with fallback (utf-16/cp1252).")
+            best = from_bytes(raw).best()
+            if best is None:
+                print("Could not detect a text encoding.")
+                return
+            content = str(best)
+            print(f"Decoded as {best.encoding}{' (with BOM)' if best.bom else ''}.")
 
             lines = content.splitlines()
             for i, line in enumerate(lines):
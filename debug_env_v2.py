@@ -2,10 +2,9 @@
 import sys
 import os
 
-sys.stdout.reconfigure(encoding='utf-8')
+from charset_normalizer import from_bytes
 
-def hex_dump(data):
-    return " ".join(f"{b:02x}" for b in data[:20])
+sys.stdout.reconfigure(encoding='utf-8')
 
 def check(filename):
     print(f"--- Checking {filename} ---")
@@ -18,29 +17,13 @@ def check(filename):
             data = f.read()
         
         print(f"Size: {len(data)}")
-        print(f"Hex start: {hex_dump(data)}")
-        
-        # Check for null bytes
-        if b'\x00' in data:
-            print("WARNING: detected null bytes, likely UTF-16")
-        
-        text = ""
-        encoding = "unknown"
         
-        try:
-            text = data.decode('utf-8')
-            encoding = "utf-8"
-            print("Decodes as UTF-8: YES")
-        except:
-            print("Decodes as UTF-8: NO")
-            try:
-                text = data.decode('utf-16')
-                encoding = "utf-16"
-                print("Decodes as UTF-16: YES")
-            except:
-                 print("Decodes as UTF-16: NO")
-                 text = data.decode('cp1252', errors='ignore')
-                 encoding = "cp1252"
+        best = from_bytes(data).best()
+        if best is None:
+            print("Could not detect a text encoding")
+            return
+        text, encoding = str(best), best.encoding
+        print(f"Detected encoding: {encoding} (BOM: {'yes' if best.bom else 'no'})")
     
         # Look for key
         if 'GOOGLE_API_KEY' in text:
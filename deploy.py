@@ -516,31 +516,18 @@ def deploy_project(zip_file, task_type="ml"):
                 # Convert to JSON string
                 deployment_json = json.dumps(deployment_info)
                 
-                temp_file_path = None
                 try:
-                    # Create a temp file to store this data
-                    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as temp_file:
-                        temp_file.write(deployment_json)
-                        temp_file_path = temp_file.name
-                    
-                    # Save to database
+                    # Save to database straight from memory
                     deployment_filename = f"{repo_name}_deployment_info.json"
                     # Ensure deployments directory exists in database
                     if not DEPLOYMENT_DIR in db_fs.list_files("ml_system"):
                         db_fs._get_or_create_directory(DEPLOYMENT_DIR)
                     
                     # Save the deployment info
-                    db_fs.save_file(temp_file_path, DEPLOYMENT_DIR)
+                    db_fs.save_file_content(deployment_json.encode('utf-8'), deployment_filename, DEPLOYMENT_DIR)
                     logger.info(f"Saved deployment info to database: {deployment_filename}")
                 except Exception as db_error:
                     logger.error(f"Error saving deployment info to database: {str(db_error)}")
-                finally:
-                    # Clean up temp file
-                    if temp_file_path and os.path.exists(temp_file_path):
-                        try:
-                            os.unlink(temp_file_path)
-                        except Exception as e:
-                            logger.error(f"Error cleaning up temp file: {str(e)}")
                 
                 # Create Render dashboard URL (direct to blueprint creation)
                 render_url = "https://dashboard.render.com/blueprint/new"
@@ -619,26 +606,13 @@ def check_render_status(service_id):
         # Convert to JSON string
         status_json = json.dumps(status_record)
         
-        temp_file_path = None
         try:
-            # Create a temp file to store this data
-            with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as temp_file:
-                temp_file.write(status_json)
-                temp_file_path = temp_file.name
-            
-            # Save to database
+            # Save to database straight from memory
             status_filename = f"{service_id}_status.json"
-            db_fs.save_file(temp_file_path, DEPLOYMENT_DIR)
+            db_fs.save_file_content(status_json.encode('utf-8'), status_filename, DEPLOYMENT_DIR)
             logger.info(f"Updated deployment status in database: {status_filename}")
         except Exception as db_error:
             logger.error(f"Error saving status to database: {str(db_error)}")
-        finally:
-            # Clean up temp file
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                except Exception as e:
-                    logger.error(f"Error cleaning up status temp file: {str(e)}")
     except Exception as e:
         logger.error(f"Error recording status update: {str(e)}")
     
@@ -707,26 +681,13 @@ def api_deploy():
                 # Convert to JSON string
                 deployment_json = json.dumps(deployment_record)
                 
-                # Create a temp file to store this data
-                deployment_temp_path = None
                 try:
-                    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as temp_file:
-                        temp_file.write(deployment_json)
-                        deployment_temp_path = temp_file.name
-                    
-                    # Save to database
+                    # Save to database straight from memory
                     deployment_filename = f"{service_id}_deployment.json"
-                    db_fs.save_file(deployment_temp_path, DEPLOYMENT_DIR)
+                    db_fs.save_file_content(deployment_json.encode('utf-8'), deployment_filename, DEPLOYMENT_DIR)
                     logger.info(f"Saved deployment record to database: {deployment_filename}")
                 except Exception as db_error:
                     logger.error(f"Error saving deployment record to database: {str(db_error)}")
-                finally:
-                    # Clean up temp file
-                    if deployment_temp_path and os.path.exists(deployment_temp_path):
-                        try:
-                            os.unlink(deployment_temp_path)
-                        except Exception as cleanup_error:
-                            logger.error(f"Error cleaning up deployment temp file: {str(cleanup_error)}")
             except Exception as e:
                 logger.error(f"Error recording deployment: {str(e)}")
         
@@ -0,0 +1,29 @@
+"""
+In-memory cache for the Gemini plot explanations shared by the visualization modules
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Explanations keyed by a digest of (model, prompt): re-rendering the same plots asks
+# Gemini the same question, so answer repeats from memory instead of another API call
+EXPLANATION_CACHE_SIZE = 256
+_explanation_cache = OrderedDict()
+_explanation_cache_lock = threading.Lock()
+
+def cached_explanation(model_name, prompt, generate):
+    """Return generate() for this model and prompt, reusing an earlier answer when there is one.
+    Exceptions from generate() propagate and nothing is cached for that call."""
+    key = hashlib.blake2b(f"{model_name}\0{prompt}".encode('utf-8'), digest_size=16).digest()
+    with _explanation_cache_lock:
+        text = _explanation_cache.get(key)
+        if text is not None:
+            _explanation_cache.move_to_end(key)
+            return text
+
+    text = generate()
+    with _explanation_cache_lock:
+        _explanation_cache[key] = text
+        while len(_explanation_cache) > EXPLANATION_CACHE_SIZE:
+            _explanation_cache.popitem(last=False)
+    return text
@@ -0,0 +1,18 @@
+"""Gunicorn settings for the Flask backends.
+
+    gunicorn -c gunicorn.conf.py app:app
+    PORT=5004 gunicorn -c gunicorn.conf.py dataset_alter_expand:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Threaded workers: LLM calls are I/O bound and pandas/Pillow/sqlite release the GIL for
+# most of a request, so a few threads per process keep the CPU busy
+workers = int(os.getenv("GUNICORN_WORKERS", max(2, os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# LLM expansion/alteration and model training can take minutes
+timeout = 300
+accesslog = "-"
@@ -1,4 +1,6 @@
 // lib/cloudinary.js
+import fs from 'fs';
+import https from 'https';
 import { v2 as cloudinary } from 'cloudinary';
 
 // Configure Cloudinary
@@ -8,12 +10,49 @@ cloudinary.config({
     api_secret: process.env.CLOUDINARY_API_SECRET
 });
 
+// Shared keep-alive agent so repeated uploads and deletes reuse TLS connections
+// instead of handshaking on every call
+const agent = new https.Agent({ keepAlive: true, maxSockets: 32 });
+
+const MB = 1024 * 1024;
+
+// Larger files get larger chunks to amortize per-request overhead, while small
+// ones keep fine-grained retries
+function pickChunkSize(sizeBytes) {
+    if (sizeBytes < 100 * MB) return 6 * MB;
+    if (sizeBytes < 1024 * MB) return 20 * MB;
+    return 50 * MB;
+}
+
+// upload_large only reports through its callback, so wrap it in a promise
+function uploadLarge(path, options) {
+    return new Promise((resolve, reject) => {
+        cloudinary.uploader.upload_large(path, options, (error, result) => {
+            if (error) reject(error);
+            else resolve(result);
+        });
+    });
+}
+
+// Chunked upload of an in-memory buffer through upload_chunked_stream, which
+// avoids base64-encoding the whole buffer into a data URI first
+function uploadLargeBuffer(buffer, options) {
+    return new Promise((resolve, reject) => {
+        const stream = cloudinary.uploader.upload_chunked_stream(options, (error, result) => {
+            if (error) reject(error);
+            else resolve(result);
+        });
+        stream.end(buffer);
+    });
+}
+
 // Upload image to Cloudinary
 export async function uploadToCloudinary(file, folder = 'freemind-projects') {
     try {
         const result = await cloudinary.uploader.upload(file, {
             folder: folder,
             resource_type: 'auto',
+            agent,
             transformation: [
                 { width: 800, height: 600, crop: 'limit' },
                 { quality: 'auto' },
@@ -42,7 +81,8 @@ export async function uploadDatasetToCloudinary(file, folder = 'freemind-dataset
             folder: folder,
             resource_type: 'raw', // For non-image files
             use_filename: true,
-            unique_filename: true
+            unique_filename: true,
+            agent
         });
         
         return {
@@ -61,7 +101,7 @@ export async function uploadDatasetToCloudinary(file, folder = 'freemind-dataset
 // Delete image from Cloudinary
 export async function deleteFromCloudinary(publicId) {
     try {
-        const result = await cloudinary.uploader.destroy(publicId);
+        const result = await cloudinary.uploader.destroy(publicId, { agent });
         return result;
     } catch (error) {
         console.error('Cloudinary delete error:', error);
@@ -73,7 +113,8 @@ export async function deleteFromCloudinary(publicId) {
 export async function deleteDatasetFromCloudinary(publicId) {
     try {
         const result = await cloudinary.uploader.destroy(publicId, {
-            resource_type: 'raw'
+            resource_type: 'raw',
+            agent
         });
         return result;
     } catch (error) {
@@ -82,6 +123,11 @@ export async function deleteDatasetFromCloudinary(publicId) {
     }
 }
 
+// URLs are deterministic for a given public ID and options, so keep recently
+// built ones (Map iteration order doubles as the LRU order)
+const URL_CACHE_SIZE = 4096;
+const urlCache = new Map();
+
 // Get optimized image URL
 export function getOptimizedImageUrl(publicId, options = {}) {
     const {
@@ -92,45 +138,91 @@ export function getOptimizedImageUrl(publicId, options = {}) {
         format = 'auto'
     } = options;
     
-    return cloudinary.url(publicId, {
+    const key = `${publicId}|${width}|${height}|${crop}|${quality}|${format}`;
+    const cached = urlCache.get(key);
+    if (cached !== undefined) {
+        urlCache.delete(key);
+        urlCache.set(key, cached);
+        return cached;
+    }
+    
+    const url = cloudinary.url(publicId, {
         width,
         height,
         crop,
         quality,
         fetch_format: format
     });
+    urlCache.set(key, url);
+    if (urlCache.size > URL_CACHE_SIZE) {
+        urlCache.delete(urlCache.keys().next().value);
+    }
+    return url;
+}
+
+const ZIP_TAGS = ['code-zip', 'generated-project'];
+
+// Upload options shared by the buffer and file zip uploads
+function zipUploadOptions(fileName, fullFolder, sizeBytes) {
+    return {
+        folder: fullFolder,
+        public_id: fileName.replace('.zip', ''), // Remove .zip extension as Cloudinary adds it
+        resource_type: 'raw',
+        use_filename: true,
+        unique_filename: false,
+        overwrite: true,
+        tags: ZIP_TAGS,
+        chunk_size: pickChunkSize(sizeBytes),
+        agent
+    };
+}
+
+// Shape of the value returned by the zip uploads
+function zipUploadResult(result, fullFolder) {
+    return {
+        url: result.secure_url,
+        publicId: result.public_id,
+        originalFilename: result.original_filename,
+        format: result.format,
+        bytes: result.bytes,
+        createdAt: result.created_at,
+        folder: fullFolder
+    };
+}
+
+// After a network-level upload failure, fail further zip uploads fast for a
+// short cooldown instead of paying DNS/TCP/TLS timeouts on every call
+const UPLOAD_CIRCUIT_COOLDOWN_MS = 5000;
+const NETWORK_ERROR_CODES = new Set(['ECONNREFUSED', 'ECONNRESET', 'ENOTFOUND', 'ETIMEDOUT', 'EAI_AGAIN']);
+let uploadCircuitOpenUntil = 0;
+
+function checkUploadCircuit() {
+    if (Date.now() < uploadCircuitOpenUntil) {
+        throw new Error('Cloudinary is unreachable, skipping upload during cooldown');
+    }
+}
+
+function recordUploadFailure(error) {
+    const httpCode = error?.http_code ?? error?.error?.http_code;
+    const code = error?.code ?? error?.error?.code;
+    if (NETWORK_ERROR_CODES.has(code) || httpCode === 499 || httpCode >= 500) {
+        uploadCircuitOpenUntil = Date.now() + UPLOAD_CIRCUIT_COOLDOWN_MS;
+    }
 }
 
 // Upload zip file to Cloudinary
 export async function uploadZipToCloudinary(zipBuffer, fileName, userId = null, folder = 'freemind-code-zips') {
     try {
-        // Create unique filename with user prefix if provided
-        const userPrefix = userId ? `${userId}/` : '';
-        const fullFolder = `${folder}/${userPrefix}`;
+        checkUploadCircuit();
         
-        const result = await cloudinary.uploader.upload(
-            `data:application/zip;base64,${zipBuffer.toString('base64')}`,
-            {
-                folder: fullFolder,
-                public_id: fileName.replace('.zip', ''), // Remove .zip extension as Cloudinary adds it
-                resource_type: 'raw',
-                use_filename: true,
-                unique_filename: false,
-                overwrite: true,
-                tags: ['code-zip', 'generated-project']
-            }
-        );
+        // Nest under the user's folder if provided
+        const fullFolder = userId ? `${folder}/${userId}` : folder;
         
-        return {
-            url: result.secure_url,
-            publicId: result.public_id,
-            originalFilename: result.original_filename,
-            format: result.format,
-            bytes: result.bytes,
-            createdAt: result.created_at,
-            folder: fullFolder
-        };
+        const result = await uploadLargeBuffer(zipBuffer, zipUploadOptions(fileName, fullFolder, zipBuffer.length));
+        
+        return zipUploadResult(result, fullFolder);
     } catch (error) {
+        recordUploadFailure(error);
         console.error('Cloudinary zip upload error:', error);
         throw new Error(`Zip upload failed: ${error.message}`);
     }
@@ -139,30 +231,19 @@ export async function uploadZipToCloudinary(zipBuffer, fileName, userId = null,
 // Upload zip file from local path to Cloudinary
 export async function uploadZipFileToCloudinary(zipPath, fileName, userId = null, folder = 'freemind-code-zips') {
     try {
-        // Create unique filename with user prefix if provided
-        const userPrefix = userId ? `${userId}/` : '';
-        const fullFolder = `${folder}/${userPrefix}`;
+        checkUploadCircuit();
         
-        const result = await cloudinary.uploader.upload(zipPath, {
-            folder: fullFolder,
-            public_id: fileName.replace('.zip', ''), // Remove .zip extension as Cloudinary adds it
-            resource_type: 'raw',
-            use_filename: true,
-            unique_filename: false,
-            overwrite: true,
-            tags: ['code-zip', 'generated-project']
-        });
+        // Nest under the user's folder if provided
+        const fullFolder = userId ? `${folder}/${userId}` : folder;
         
-        return {
-            url: result.secure_url,
-            publicId: result.public_id,
-            originalFilename: result.original_filename,
-            format: result.format,
-            bytes: result.bytes,
-            createdAt: result.created_at,
-            folder: fullFolder
-        };
+        // Chunked upload: the file is streamed from disk in parts, so memory
+        // stays bounded and a network error only retries one part
+        const { size } = await fs.promises.stat(zipPath);
+        const result = await uploadLarge(zipPath, zipUploadOptions(fileName, fullFolder, size));
+        
+        return zipUploadResult(result, fullFolder);
     } catch (error) {
+        recordUploadFailure(error);
         console.error('Cloudinary zip file upload error:', error);
         throw new Error(`Zip file upload failed: ${error.message}`);
     }
@@ -172,7 +253,8 @@ export async function uploadZipFileToCloudinary(zipPath, fileName, userId = null
 export async function deleteZipFromCloudinary(publicId) {
     try {
         const result = await cloudinary.uploader.destroy(publicId, {
-            resource_type: 'raw'
+            resource_type: 'raw',
+            agent
         });
         return result;
     } catch (error) {
@@ -181,4 +263,34 @@ export async function deleteZipFromCloudinary(publicId) {
     }
 }
 
+const DELETE_BATCH_SIZE = 100; // Admin API limit for delete_resources
+
+// Delete many zip files in batches of up to 100 public IDs per API call; returns
+// the public IDs Cloudinary processed (batches that fail are logged and skipped)
+export async function deleteZipsFromCloudinary(publicIds) {
+    const processed = [];
+    for (let i = 0; i < publicIds.length; i += DELETE_BATCH_SIZE) {
+        const batch = publicIds.slice(i, i + DELETE_BATCH_SIZE);
+        try {
+            const result = await cloudinary.api.delete_resources(batch, {
+                resource_type: 'raw',
+                agent
+            });
+            processed.push(...Object.keys(result.deleted || {}));
+        } catch (error) {
+            console.error('Cloudinary batch zip delete error:', error);
+        }
+    }
+    return processed;
+}
+
+// Best-effort zip delete that callers don't need to await; failures are logged
+// instead of thrown, so the returned promise always resolves
+export function deleteZipFromCloudinaryInBackground(publicId) {
+    return deleteZipFromCloudinary(publicId).catch((error) => {
+        console.error('Cloudinary background zip delete error:', publicId, error.message);
+        return null;
+    });
+}
+
 export default cloudinary;
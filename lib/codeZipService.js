@@ -3,7 +3,7 @@ import path from 'path';
 import os from 'os';
 import connectDB from './mongodb.js';
 import CodeZip from '../models/codeZip.js';
-import { uploadZipToCloudinary, deleteZipFromCloudinary } from './cloudinary.js';
+import { uploadZipToCloudinary, deleteZipFromCloudinaryInBackground, deleteZipsFromCloudinary } from './cloudinary.js';
 import { 
     createZipBuffer, 
     generateZipFileName, 
@@ -249,15 +249,10 @@ export class CodeZipService {
             codeZip.status = 'deleted';
             await codeZip.save();
 
-            // If hard delete requested, also delete from Cloudinary
+            // If hard delete requested, also delete from Cloudinary; the zip is
+            // already marked deleted, so don't hold the caller on the API round-trip
             if (hardDelete) {
-                try {
-                    await deleteZipFromCloudinary(codeZip.cloudinaryPublicId);
-                    console.log('🗑️ Deleted from Cloudinary:', codeZip.cloudinaryPublicId);
-                } catch (cloudinaryError) {
-                    console.error('Error deleting from Cloudinary:', cloudinaryError);
-                    // Continue even if Cloudinary deletion fails
-                }
+                deleteZipFromCloudinaryInBackground(codeZip.cloudinaryPublicId);
             }
 
             console.log('🗑️ Code zip deleted:', zipId);
@@ -290,16 +285,10 @@ export class CodeZipService {
 
             // If hard delete requested, delete from Cloudinary too
             if (hardDelete && expiredZips.length > 0) {
-                let cloudinaryDeleted = 0;
-                for (const zip of expiredZips) {
-                    try {
-                        await deleteZipFromCloudinary(zip.cloudinaryPublicId);
-                        cloudinaryDeleted++;
-                    } catch (error) {
-                        console.error('Error deleting from Cloudinary:', zip.cloudinaryPublicId, error.message);
-                    }
-                }
-                console.log('☁️ Deleted from Cloudinary:', cloudinaryDeleted);
+                const deletedIds = await deleteZipsFromCloudinary(
+                    expiredZips.map(zip => zip.cloudinaryPublicId).filter(Boolean)
+                );
+                console.log('☁️ Deleted from Cloudinary:', deletedIds.length);
             }
 
             return {
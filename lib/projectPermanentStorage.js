@@ -1,5 +1,5 @@
 // lib/projectPermanentStorage.js
-import { uploadZipToCloudinary, uploadZipFileToCloudinary, deleteZipFromCloudinary } from './cloudinary.js';
+import { uploadZipToCloudinary, uploadZipFileToCloudinary, deleteZipsFromCloudinary } from './cloudinary.js';
 import connectDB from './mongodb.js';
 import Project from '../models/project.js';
 import fs from 'fs/promises';
@@ -337,12 +337,8 @@ export class ProjectPermanentStorage {
                 }
             }
 
-            // Delete from Cloudinary
-            const cloudinaryDeletions = await Promise.allSettled(
-                deletedPublicIds.map(publicId => deleteZipFromCloudinary(publicId))
-            );
-
-            const successfulDeletions = cloudinaryDeletions.filter(result => result.status === 'fulfilled').length;
+            // Delete from Cloudinary in batched Admin API calls
+            const successfulDeletions = (await deleteZipsFromCloudinary(deletedPublicIds)).length;
             
             // Save project changes
             await project.save();
@@ -1,7 +1,7 @@
 // lib/zipLifecycleManager.js
 import projectPermanentStorage from './projectPermanentStorage.js';
 import zipCacheService from './zipCacheService.js';
-import { deleteZipFromCloudinary } from './cloudinary.js';
+import { deleteZipsFromCloudinary } from './cloudinary.js';
 import connectDB from './mongodb.js';
 import Project from '../models/project.js';
 import CodeZip from '../models/codeZip.js';
@@ -422,12 +422,6 @@ export class ZipLifecycleManager {
                         if (!dryRun) {
                             if (zipFile.cloudinaryPublicId) {
                                 deletedPublicIds.push(zipFile.cloudinaryPublicId);
-                                try {
-                                    await deleteZipFromCloudinary(zipFile.cloudinaryPublicId);
-                                    deletedFromCloudinary++;
-                                } catch (error) {
-                                    console.log(`Failed to delete from Cloudinary: ${zipFile.cloudinaryPublicId}`);
-                                }
                             }
                             project.generatedFiles.zipFile = undefined;
                             await project.save();
@@ -436,6 +430,11 @@ export class ZipLifecycleManager {
                 }
             }
 
+            // Delete from Cloudinary in batched Admin API calls
+            if (deletedPublicIds.length > 0) {
+                deletedFromCloudinary = (await deleteZipsFromCloudinary(deletedPublicIds)).length;
+            }
+
             return {
                 expiredFiles: expiredCount,
                 deletedFromCloudinary,
@@ -520,16 +519,14 @@ export class ZipLifecycleManager {
             let deletedFromCache = 0;
             let deletedFromCloudinary = 0;
 
-            for (const zip of expiredZips) {
-                if (!dryRun) {
-                    // Delete from Cloudinary
-                    try {
-                        await deleteZipFromCloudinary(zip.cloudinaryPublicId);
-                        deletedFromCloudinary++;
-                    } catch (error) {
-                        console.log(`Failed to delete from Cloudinary: ${zip.cloudinaryPublicId}`);
-                    }
+            if (!dryRun && expiredZips.length > 0) {
+                // Delete from Cloudinary in batched Admin API calls
+                const deletedIds = await deleteZipsFromCloudinary(
+                    expiredZips.map(zip => zip.cloudinaryPublicId).filter(Boolean)
+                );
+                deletedFromCloudinary = deletedIds.length;
 
+                for (const zip of expiredZips) {
                     // Delete from database
                     await CodeZip.deleteOne({ _id: zip._id });
                     deletedFromCache++;
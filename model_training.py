@@ -1,5 +1,7 @@
 import pickle
 import os
+import importlib.util
+import joblib
 import numpy as np
 from sklearn.model_selection import GridSearchCV
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
@@ -19,23 +21,11 @@ from db_file_system import DBFileSystem
 # Initialize database file system
 db_fs = DBFileSystem()
 
-# Check if TensorFlow is available
-try:
-    import tensorflow as tf
-    from tensorflow.keras.models import Sequential
-    from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
-    from tensorflow.keras.optimizers import Adam
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-
-# Check if YOLO is available
-try:
-    from ultralytics import YOLO
-    import torch
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
+# Check if TensorFlow / YOLO are installed without importing them; the frameworks
+# are imported by the training functions that need them
+TENSORFLOW_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
+YOLO_AVAILABLE = (importlib.util.find_spec('ultralytics') is not None
+                  and importlib.util.find_spec('torch') is not None)
 
 def train_models(X_train, y_train, X_test, y_test, task_type, models_dir, dataset_folder=None):
     """Train models based on task type"""
@@ -365,6 +355,8 @@ def train_yolo_model(dataset_folder, models_dir):
     
     if not YOLO_AVAILABLE:
         raise ImportError("YOLO is required for object detection but not available")
+    from ultralytics import YOLO
+    import torch
     
     # Find data.yaml file in the dataset folder
     yaml_files = [f for f in os.listdir(dataset_folder) if f.endswith('.yaml')]
@@ -964,10 +956,10 @@ def save_best_model(model, models_dir):
                 os.remove(temp_model_path)
         
         else:
-            # Regular pickle serialization for scikit-learn models
+            # joblib serialization for scikit-learn models; compress=3 stores the
+            # estimator's numpy arrays already compressed so the ZIP step can skip them
             temp_path = os.path.join(temp_dir, "best_model.pkl")
-            with open(temp_path, "wb") as f:
-                pickle.dump(model, f)
+            joblib.dump(model, temp_path, compress=3, protocol=pickle.HIGHEST_PROTOCOL)
             
             if is_database:
                 # Save to database
@@ -975,8 +967,7 @@ def save_best_model(model, models_dir):
                 print("Best model saved successfully to database")
             else:
                 # Save to filesystem
-                with open(os.path.join(models_dir, "best_model.pkl"), "wb") as f:
-                    pickle.dump(model, f)
+                joblib.dump(model, os.path.join(models_dir, "best_model.pkl"), compress=3, protocol=pickle.HIGHEST_PROTOCOL)
                 print("Best model saved successfully as best_model.pkl")
             
             # Clean up temporary file
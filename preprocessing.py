@@ -3,6 +3,7 @@ import numpy as np
 import re
 import nltk
 import os
+import importlib.util
 import tempfile
 import shutil
 import zipfile
@@ -19,20 +20,18 @@ from db_file_system import DBFileSystem
 # Initialize database file system
 db_fs = DBFileSystem()
 
-# Check if TensorFlow is available
-try:
-    import tensorflow as tf
-    from tensorflow.keras.preprocessing.image import ImageDataGenerator
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
+# Check if TensorFlow is installed without importing it; preprocess_image_dataset
+# imports it when an image dataset is actually processed
+TENSORFLOW_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
 
 # Download necessary NLTK resources
 nltk.download('stopwords', quiet=True)
 nltk.download('wordnet', quiet=True)
 
-def preprocess_dataset(df, task_type, dataset_folder=None):
-    """Preprocess dataset based on task type"""
+def preprocess_dataset(df, task_type, dataset_folder=None, downcast=False):
+    """Preprocess dataset based on task type.
+    downcast=True is for frames that went through shrink_dtypes(): features of any
+    numeric width and category columns are kept alongside float64/int64 and object."""
     # Add image classification handling while preserving original logic
     if task_type == 'image_classification' and dataset_folder is not None:
         return preprocess_image_dataset(dataset_folder)
@@ -47,8 +46,13 @@ def preprocess_dataset(df, task_type, dataset_folder=None):
     X = df.iloc[:, :-1]
     y = df.iloc[:, -1]
 
-    numeric_cols = X.select_dtypes(include=['float64', 'int64']).columns
-    categorical_cols = X.select_dtypes(include=['object']).columns
+    if downcast:
+        # Downcast frames hold int8/float32/category columns the default lists would drop
+        numeric_cols = X.select_dtypes(include=['number']).columns
+        categorical_cols = X.select_dtypes(include=['object', 'category']).columns
+    else:
+        numeric_cols = X.select_dtypes(include=['float64', 'int64']).columns
+        categorical_cols = X.select_dtypes(include=['object']).columns
 
     # Preprocessing for numeric features
     numeric_transformer = Pipeline(steps=[
@@ -155,6 +159,7 @@ def preprocess_image_dataset(dataset_folder):
     """
     if not TENSORFLOW_AVAILABLE:
         raise ImportError("TensorFlow is required for image classification but not available")
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
     
     print("Preprocessing image classification dataset...")
     
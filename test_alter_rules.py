@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the rule-based CSV alteration in DataExpander: operation precedence,
+percentages and which columns a prompt targets
+"""
+import builtins
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Filesystem functions that apply_patches() replaces process-wide on import
+PATCHED_FUNCTIONS = [
+    (os, "makedirs"), (os, "listdir"), (os, "remove"),
+    (os.path, "exists"), (os.path, "isdir"), (os.path, "isfile"),
+    (shutil, "rmtree"), (builtins, "open"),
+]
+
+def load_alter_expand():
+    """Import dataset_alter_expand with its ml_system.db created in a scratch directory,
+    putting back the filesystem functions its apply_patches() call replaces"""
+    originals = [(owner, name, getattr(owner, name)) for owner, name in PATCHED_FUNCTIONS]
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        return importlib.import_module('dataset_alter_expand')
+    finally:
+        os.chdir(cwd)
+        for owner, name, func in originals:
+            setattr(owner, name, func)
+
+def sample_frame():
+    return pd.DataFrame({
+        'unit price': [10.0, 20.0, 40.0],
+        'price': [100.0, 200.0, 400.0],
+        'qty': [1, 2, 3],
+        'name': ['a', 'b', 'c'],
+    })
+
+def alter(prompt):
+    alter_expand = load_alter_expand()
+    return alter_expand.DataExpander().alter_csv_rule_based(sample_frame(), prompt)
+
+def test_operation_precedence():
+    """Multiply wins over increase when a prompt names both"""
+    out, applied = alter('increase the value multiply by 2')
+    print('🧪 Operation precedence')
+    assert applied
+    assert out['qty'].tolist() == [2, 4, 6]
+    assert out['price'].tolist() == [200.0, 400.0, 800.0]
+    print('   ✅ Multiply applied')
+
+def test_percentages():
+    """A percentage counts with or without a space before the % sign"""
+    print('🧪 Percentages')
+    for prompt in ('increase qty by 50%', 'increase qty by 50 %'):
+        out, applied = alter(prompt)
+        assert applied
+        assert out['qty'].tolist() == [1.5, 3.0, 4.5], prompt
+        print(f'   ✅ "{prompt}"')
+
+    out, applied = alter('decrease price by 25 %')
+    assert applied
+    assert out['price'].tolist() == [75.0, 150.0, 300.0]
+    print('   ✅ Percentage decrease')
+
+def test_mentioned_columns():
+    """Every column named in the prompt is targeted, including names inside longer ones"""
+    print('🧪 Mentioned columns')
+    out, applied = alter('multiply unit price by 2')
+    assert applied
+    # "unit price" also names "price"; qty is left alone
+    assert out['unit price'].tolist() == [20.0, 40.0, 80.0]
+    assert out['price'].tolist() == [200.0, 400.0, 800.0]
+    assert out['qty'].tolist() == [1, 2, 3]
+    print('   ✅ Both "unit price" and "price" altered')
+
+    out, applied = alter('add 5 to qty')
+    assert applied
+    assert out['qty'].tolist() == [6, 7, 8]
+    assert out['price'].tolist() == [100.0, 200.0, 400.0]
+    print('   ✅ Only qty altered')
+
+if __name__ == "__main__":
+    test_operation_precedence()
+    test_percentages()
+    test_mentioned_columns()
+    print('🎉 Rule-based alteration checks passed')
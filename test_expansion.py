@@ -4,7 +4,6 @@ Test script to expand the movies dataset
 """
 import requests
 import json
-import base64
 
 def expand_movies_dataset():
     """Expand the movies dataset with AI-generated new movies"""
@@ -25,10 +24,11 @@ def expand_movies_dataset():
         result = response.json()
         
         if result.get('success'):
-            # Decode and save the CSV
-            csv_data = base64.b64decode(result['csvData']).decode('utf-8')
-            with open('expanded_movies.csv', 'w', encoding='utf-8') as f:
-                f.write(csv_data)
+            # Download the saved CSV and keep a local copy
+            download = requests.get(f"http://localhost:5004/api/download/{result['expanded_filename']}", timeout=60)
+            download.raise_for_status()
+            with open('expanded_movies.csv', 'wb') as f:
+                f.write(download.content)
             
             print("✅ Success! Generated expanded movies dataset")
             print(f"📊 Original rows: {result['original_rows']}")
@@ -45,7 +45,9 @@ def expand_movies_dataset():
             # Show a preview of the new data
             print("\n🎭 Preview of Generated Movies:")
             if 'previewData' in result:
-                preview = result['previewData'][-5:]  # Show last 5 (new movies)
+                # Columnar preview: {"columns": [...], "rows": [[...], ...]}
+                columns = result['previewData']['columns']
+                preview = [dict(zip(columns, row)) for row in result['previewData']['rows'][-5:]]  # Show last 5 (new movies)
                 for i, movie in enumerate(preview, 1):
                     print(f"  {i}. {movie.get('title', 'Unknown')} ({movie.get('year', 'N/A')}) - {movie.get('director', 'Unknown')}")
                     
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the zip built by DataExpander.expand_images: entry names, original bytes
+kept as uploaded, and augmented copies in the source image format
+"""
+import builtins
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Filesystem functions that apply_patches() replaces process-wide on import
+PATCHED_FUNCTIONS = [
+    (os, "makedirs"), (os, "listdir"), (os, "remove"),
+    (os.path, "exists"), (os.path, "isdir"), (os.path, "isfile"),
+    (shutil, "rmtree"), (builtins, "open"),
+]
+
+def load_alter_expand():
+    """Import dataset_alter_expand with its ml_system.db created in a scratch directory,
+    putting back the filesystem functions its apply_patches() call replaces"""
+    originals = [(owner, name, getattr(owner, name)) for owner, name in PATCHED_FUNCTIONS]
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        return importlib.import_module('dataset_alter_expand')
+    finally:
+        os.chdir(cwd)
+        for owner, name, func in originals:
+            setattr(owner, name, func)
+
+def image_bytes(fmt, mode, color):
+    buf = io.BytesIO()
+    Image.new(mode, (16, 12), color).save(buf, format=fmt)
+    return buf.getvalue()
+
+def upload(content, filename):
+    return FileStorage(stream=io.BytesIO(content), filename=filename)
+
+def test_expand_images_zip_entries():
+    """A PNG and a JPEG come back as originals plus augmented copies; other files are skipped"""
+    alter_expand = load_alter_expand()
+    png = image_bytes("PNG", "RGBA", (200, 30, 30, 128))
+    jpeg = image_bytes("JPEG", "RGB", (30, 200, 30))
+    uploads = [upload(png, "cat.png"), upload(jpeg, "dog.jpg"), upload(b"not an image", "notes.txt")]
+
+    sink = alter_expand.DataExpander().expand_images(uploads, 3)
+
+    print('🧪 Expanded images zip')
+    with zipfile.ZipFile(io.BytesIO(sink.getvalue())) as zf:
+        print(f'   Entries: {sorted(zf.namelist())}')
+        assert sorted(zf.namelist()) == [
+            "cat.png", "cat_aug1.png", "cat_aug2.png", "cat_aug3.png",
+            "dog.jpg", "dog_aug1.jpg", "dog_aug2.jpg", "dog_aug3.jpg",
+        ]
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+
+        # Originals go in byte-for-byte
+        assert zf.read("cat.png") == png
+        assert zf.read("dog.jpg") == jpeg
+
+        # Copies keep the source format (and PNG keeps its alpha channel)
+        for i in range(1, 4):
+            with Image.open(io.BytesIO(zf.read(f"cat_aug{i}.png"))) as img:
+                assert (img.format, img.mode, img.size) == ("PNG", "RGBA", (16, 12))
+            with Image.open(io.BytesIO(zf.read(f"dog_aug{i}.jpg"))) as img:
+                assert (img.format, img.size) == ("JPEG", (16, 12))
+    print('   ✅ Names, stored originals and formats match')
+
+def test_expand_images_without_images():
+    """Uploads with no image in them give an empty zip"""
+    alter_expand = load_alter_expand()
+    sink = alter_expand.DataExpander().expand_images([upload(b"a,b\n1,2\n", "data.csv")], 2)
+
+    with zipfile.ZipFile(io.BytesIO(sink.getvalue())) as zf:
+        assert zf.namelist() == []
+    print('   ✅ Non-image uploads are skipped')
+
+if __name__ == "__main__":
+    test_expand_images_zip_entries()
+    test_expand_images_without_images()
+    print('🎉 Image expansion checks passed')
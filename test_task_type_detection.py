@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test task-type detection in data_handling: verdicts on regression and classification
+datasets, and the sampled KDE continuity score on long targets
+"""
+import importlib
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def load_data_handling():
+    """Import data_handling with its ml_system.db created in a scratch directory"""
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        return importlib.import_module('data_handling')
+    finally:
+        os.chdir(cwd)
+
+def features(rng, n):
+    return pd.DataFrame({
+        'age': rng.integers(18, 80, n).astype('int64'),
+        'income': rng.normal(50000, 12000, n),
+        'score': rng.uniform(0, 1, n),
+    })
+
+def regression_datasets():
+    rng = np.random.default_rng(0)
+
+    linear = features(rng, 500)
+    linear['price'] = linear['income'] * 3.5 + linear['age'] * 120 + rng.normal(0, 5000, 500)
+
+    whole_dollars = features(rng, 500)
+    whole_dollars['price'] = (whole_dollars['income'] * 4).round()
+
+    with_gaps = features(rng, 300)
+    with_gaps['target'] = rng.normal(100, 25, 300)
+    with_gaps.loc[::7, 'target'] = np.nan
+
+    # Longer than the KDE sample cap
+    large = features(rng, 15000)
+    large['price'] = large['income'] * 2.0 + rng.normal(0, 3000, 15000)
+
+    return {'linear': linear, 'whole_dollars': whole_dollars, 'with_gaps': with_gaps, 'large': large}
+
+def classification_datasets():
+    rng = np.random.default_rng(1)
+
+    binary = features(rng, 500)
+    binary['label'] = (binary['score'] > 0.5).astype('int64')
+
+    multiclass = features(rng, 500)
+    multiclass['label'] = rng.integers(0, 5, 500).astype('int64')
+
+    float_labels = features(rng, 400)
+    float_labels['label'] = rng.integers(0, 3, 400).astype('float64')
+    float_labels.loc[::11, 'label'] = np.nan
+
+    empty_last = features(rng, 200)
+    empty_last['label'] = rng.integers(0, 2, 200).astype('int64')
+    empty_last['notes'] = np.nan
+
+    large = features(rng, 15000)
+    large['label'] = rng.integers(0, 4, 15000).astype('int64')
+
+    return {'binary': binary, 'multiclass': multiclass, 'float_labels': float_labels,
+            'empty_last': empty_last, 'large': large}
+
+def test_task_type_verdicts():
+    """Each dataset gets the verdict the per-value implementation gave before vectorizing"""
+    data_handling = load_data_handling()
+    print('🧪 Task type verdicts')
+    for expected, datasets in (('regression', regression_datasets()),
+                               ('classification', classification_datasets())):
+        for name, df in datasets.items():
+            verdict = data_handling._detect_task_type_from_df(df)
+            print(f'   {name:<14} {verdict:<15} {"✅" if verdict == expected else "❌"}')
+            assert verdict == expected, f'{name}: expected {expected}, got {verdict}'
+
+def test_sampled_continuity_score():
+    """On targets longer than the sample cap the sampled score tracks the full-data score"""
+    data_handling = load_data_handling()
+    rng = np.random.default_rng(3)
+    targets = {
+        'normal': rng.normal(100, 25, 50000),
+        'lognormal': rng.lognormal(3, 1, 50000),
+        'uniform': rng.uniform(0, 1, 50000),
+        'bimodal': np.concatenate([rng.normal(0, 1, 25000), rng.normal(8, 1, 25000)]),
+        'four_classes': rng.integers(0, 4, 50000).astype('float64'),
+        'twenty_classes': rng.integers(0, 20, 30000).astype('float64'),
+    }
+    print('🧪 Sampled vs full-data continuity score')
+    for name, values in targets.items():
+        sampled = data_handling._continuity_score(values)
+        full = data_handling._continuity_score(values, max_samples=len(values))
+        close = abs(sampled - full) <= 0.02 * max(full, 1.0)
+        print(f'   {name:<14} sampled={sampled:.4f} full={full:.4f} {"✅" if close else "❌"}')
+        assert close, f'{name}: sampled score {sampled} too far from {full}'
+        assert (sampled < 2) == (full < 2), f'{name}: sampling moved the score across the threshold'
+
+if __name__ == "__main__":
+    test_task_type_verdicts()
+    test_sampled_continuity_score()
+    print('🎉 Task type detection checks passed')
@@ -155,7 +155,7 @@ if uploaded_file is not None:
                 feature_list += f"    '{feature}': st.number_input('Enter {feature}', value=0.0),\n"
         
         code_template = f"""
-import pickle
+import joblib
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -163,8 +163,7 @@ import numpy as np
 # Load the model from file
 def load_model():
   try:
-      with open('best_model.pkl', 'rb') as f:
-          model = pickle.load(f)
+      model = joblib.load('best_model.pkl')
       return model
   except Exception as e:
       st.error(f"Error loading model: {{e}}")
@@ -274,6 +273,7 @@ matplotlib
 seaborn
 scikit-learn
 numpy
+joblib
 """
     
     # Add TensorFlow dependencies if needed
@@ -374,7 +374,11 @@ def create_project_zip(model_file, models_dir, downloads_dir, is_image_model=Fal
         temp_zip_path = os.path.join(temp_dir, f"project_{download_id}.zip")
         
         # Create the ZIP file
-        with zipfile.ZipFile(temp_zip_path, 'w') as zipf:
+        # Text files are deflated at level 1 (the entries are tiny, so higher levels
+        # only burn CPU); the model is stored as-is since joblib/keras/torch
+        # artifacts are already compressed and would only pay for a second pass
+        with zipfile.ZipFile(temp_zip_path, 'w', compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=1, allowZip64=True) as zipf:
             # Add the model file
             if is_database_models:
                 # Extract directory name
@@ -388,19 +392,15 @@ def create_project_zip(model_file, models_dir, downloads_dir, is_image_model=Fal
                 # Get the model from database
                 try:
                     model_content = db_fs.get_file(model_file, models_dir_name)
-                    # Save to a temporary file
-                    temp_model_path = os.path.join(temp_dir, model_file)
-                    with open(temp_model_path, 'wb') as f:
-                        f.write(model_content)
-                    # Add to zip
-                    zipf.write(temp_model_path, arcname=model_file)
+                    # Add to zip straight from memory
+                    zipf.writestr(model_file, model_content, compress_type=zipfile.ZIP_STORED)
                 except Exception as e:
                     print(f"Error getting model file from database: {e}")
             else:
                 # Standard filesystem
                 model_path = os.path.join(models_dir, model_file)
                 if os.path.exists(model_path):
-                    zipf.write(model_path, arcname=model_file)
+                    zipf.write(model_path, arcname=model_file, compress_type=zipfile.ZIP_STORED)
             
             # Add the load_model.py file
             if is_database_downloads:
@@ -415,12 +415,8 @@ def create_project_zip(model_file, models_dir, downloads_dir, is_image_model=Fal
                 # Get the file from database
                 try:
                     content = db_fs.get_file("load_model.py", downloads_dir_name)
-                    # Save to a temporary file
-                    temp_file_path = os.path.join(temp_dir, "load_model.py")
-                    with open(temp_file_path, 'wb') as f:
-                        f.write(content)
-                    # Add to zip
-                    zipf.write(temp_file_path, arcname="load_model.py")
+                    # Add to zip straight from memory
+                    zipf.writestr("load_model.py", content)
                 except Exception as e:
                     print(f"Error getting load_model.py from database: {e}")
             else:
@@ -434,12 +430,8 @@ def create_project_zip(model_file, models_dir, downloads_dir, is_image_model=Fal
                 # Get the file from database
                 try:
                     content = db_fs.get_file("requirements.txt", downloads_dir_name)
-                    # Save to a temporary file
-                    temp_file_path = os.path.join(temp_dir, "requirements.txt")
-                    with open(temp_file_path, 'wb') as f:
-                        f.write(content)
-                    # Add to zip
-                    zipf.write(temp_file_path, arcname="requirements.txt")
+                    # Add to zip straight from memory
+                    zipf.writestr("requirements.txt", content)
                 except Exception as e:
                     print(f"Error getting requirements.txt from database: {e}")
             else:
@@ -5,6 +5,7 @@ import numpy as np
 import seaborn as sns
 from io import BytesIO
 import base64
+from explanation_cache import cached_explanation
 from sklearn.metrics import (confusion_matrix, precision_recall_curve, roc_curve, auc,
                              classification_report, average_precision_score, 
                              mean_squared_error, r2_score)
@@ -75,12 +76,14 @@ except Exception as e:
 # ... (lines 38-80 unchanged)
 
 def get_gemini_explanation(data, prompt):
-    """Get AI-generated explanation for visualizations using Gemini model"""
+    """Get AI-generated explanation for visualizations using Gemini model (cached per prompt)"""
     if GEMINI_AVAILABLE:
         try:
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content(prompt)
-            return response.text
+            model_name = 'gemini-pro'
+            return cached_explanation(
+                model_name, prompt,
+                lambda: genai.GenerativeModel(model_name).generate_content(prompt).text
+            )
         except Exception as e:
             return f"Unable to generate explanation: {str(e)}"
     else:
@@ -5,6 +5,7 @@ import numpy as np
 import seaborn as sns
 from io import BytesIO
 import base64
+from explanation_cache import cached_explanation
 from sklearn.metrics import confusion_matrix, classification_report, accuracy_score
 import os
 import tensorflow as tf
@@ -125,13 +126,14 @@ def fig_to_base64(fig):
     return img_str
 
 def get_gemini_explanation(data, prompt):
-    """Get AI-generated explanation for visualizations using Gemini model"""
+    """Get AI-generated explanation for visualizations using Gemini model (cached per prompt)"""
     if GEMINI_AVAILABLE:
         try:
             model_name = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content(prompt)
-            return response.text
+            return cached_explanation(
+                model_name, prompt,
+                lambda: genai.GenerativeModel(model_name).generate_content(prompt).text
+            )
         except Exception as e:
             return f"Unable to generate explanation: {str(e)}"
     else: